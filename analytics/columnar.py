@@ -0,0 +1,417 @@
+import asyncio
+import io
+import os
+import re
+import sys
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from typing import Iterable, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from cloud.storage import ICloudStorage
+from database.adapters import IStreamingDatabase, month_bounds
+from observability.log import get_logger
+
+logger = get_logger(__name__)
+
+# Cópia analítica das NFs em Parquet, particionada por emitente e mês:
+#   <prefixo>/cnpj_emitente=<cnpj>/ano_mes=<AAAA-MM>/data.parquet
+# Agregações ("total de ICMS do CNPJ X em março") leem só as partições e colunas
+# necessárias, com filtros aplicados nas estatísticas dos row groups, sem tocar o banco OLTP.
+
+NF_SCHEMA = pa.schema([
+    ("chave", pa.string()),
+    ("numero", pa.string()),
+    ("serie", pa.string()),
+    ("status", pa.string()),
+    ("data_emissao", pa.timestamp("ms")),
+    ("cnpj_emitente", pa.string()),
+    ("razao_social_emitente", pa.string()),
+    ("cnpj_destinatario", pa.string()),
+    ("uf_destinatario", pa.string()),
+    ("valor_total", pa.float64()),
+    ("valor_icms", pa.float64()),
+    ("valor_ipi", pa.float64()),
+    ("valor_pis", pa.float64()),
+    ("valor_cofins", pa.float64()),
+])
+
+# Campos lidos do banco na exportação (projeção: os itens da NF não são trafegados)
+EXPORT_FIELDS = (
+    "chave", "numero", "serie", "status", "data_emissao",
+    "emitente.cnpj", "emitente.razao_social", "destinatario.cnpj", "destinatario.uf",
+    "valor_total", "valor_icms", "valor_ipi", "valor_pis", "valor_cofins",
+)
+
+METRICS = ("valor_total", "valor_icms", "valor_ipi", "valor_pis", "valor_cofins")
+AGGREGATIONS = ("sum", "mean", "min", "max", "count")
+GROUP_BY_COLUMNS = ("cnpj_emitente", "ano_mes", "status", "uf_destinatario", "cnpj_destinatario")
+ROW_GROUP_SIZE = 10000
+PARTITION_FILE = "data.parquet"
+# 12 posições alfanuméricas (CNPJ alfanumérico, a partir de 2026) + 2 dígitos verificadores
+CNPJ_PATTERN = re.compile(r"[0-9A-Z]{12}[0-9]{2}")
+
+
+def to_row(nf: dict) -> dict:
+    """Achata um documento de NF no formato das colunas de NF_SCHEMA."""
+    emitente = nf.get("emitente") or {}
+    destinatario = nf.get("destinatario") or {}
+    return {
+        "chave": nf.get("chave"),
+        "numero": nf.get("numero"),
+        "serie": nf.get("serie"),
+        "status": nf.get("status"),
+        "data_emissao": nf.get("data_emissao"),
+        "cnpj_emitente": emitente.get("cnpj"),
+        "razao_social_emitente": emitente.get("razao_social"),
+        "cnpj_destinatario": destinatario.get("cnpj"),
+        "uf_destinatario": destinatario.get("uf"),
+        "valor_total": nf.get("valor_total"),
+        "valor_icms": nf.get("valor_icms"),
+        "valor_ipi": nf.get("valor_ipi"),
+        "valor_pis": nf.get("valor_pis"),
+        "valor_cofins": nf.get("valor_cofins"),
+    }
+
+
+def normalize_cnpj(cnpj: str) -> str:
+    """Remove a pontuação do CNPJ e o valida, já que ele vira parte do caminho da partição."""
+    normalized = re.sub(r"[.\-/\s]", "", str(cnpj)).upper()
+    if not CNPJ_PATTERN.fullmatch(normalized):
+        raise ValueError(f"CNPJ inválido: '{cnpj}'.")
+    return normalized
+
+
+def partition_key(prefix: str, cnpj: str, ano_mes: str) -> str:
+    return f"{prefix}/cnpj_emitente={cnpj}/ano_mes={ano_mes}/{PARTITION_FILE}"
+
+
+def parse_partition_key(key: str) -> Optional[tuple]:
+    values = dict(part.split("=", 1) for part in key.split("/") if "=" in part)
+    if "cnpj_emitente" not in values or "ano_mes" not in values:
+        return None
+    return values["cnpj_emitente"], values["ano_mes"]
+
+
+class IPartitionStore(ABC):
+    @abstractmethod
+    def write(self, key: str, data: bytes) -> None:
+        pass
+
+    @abstractmethod
+    def open(self, key: str):
+        """Retorna uma fonte legível pelo pyarrow (caminho ou buffer)."""
+        pass
+
+    @abstractmethod
+    def list(self, prefix: str) -> list[str]:
+        pass
+
+    def exists(self, key: str) -> bool:
+        return key in self.list(os.path.dirname(key))
+
+    @contextmanager
+    def sink(self, key: str):
+        """Destino de escrita incremental; a partição só é gravada se o bloco terminar sem erro."""
+        buffer = io.BytesIO()
+        yield buffer
+        self.write(key, buffer.getvalue())
+
+
+class LocalPartitionStore(IPartitionStore):
+    def __init__(self, root: str):
+        self.root = root
+
+    def write(self, key: str, data: bytes) -> None:
+        with self.sink(key) as f:
+            f.write(data)
+
+    @contextmanager
+    def sink(self, key: str):
+        # Escrita atômica: leitores nunca enxergam um arquivo Parquet pela metade
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                yield f
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def open(self, key: str):
+        return os.path.join(self.root, key)
+
+    def list(self, prefix: str) -> list[str]:
+        base = os.path.join(self.root, prefix)
+        keys = []
+        for dirpath, _, filenames in os.walk(base):
+            for filename in filenames:
+                if filename == PARTITION_FILE:
+                    keys.append(os.path.relpath(os.path.join(dirpath, filename), self.root).replace(os.sep, "/"))
+        return keys
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(os.path.join(self.root, key))
+
+
+class CloudPartitionStore(IPartitionStore):
+    def __init__(self, storage: ICloudStorage, bucket_name: str):
+        self.storage = storage
+        self.bucket_name = bucket_name
+
+    def write(self, key: str, data: bytes) -> None:
+        self.storage.upload_file(self.bucket_name, key, data)
+
+    def open(self, key: str):
+        return pa.BufferReader(self.storage.download_file(self.bucket_name, key))
+
+    def list(self, prefix: str) -> list[str]:
+        return [key for key in self.storage.list_files(self.bucket_name, prefix) if key.endswith(PARTITION_FILE)]
+
+
+def partition_store_from_env() -> Optional[IPartitionStore]:
+    """Store da cópia analítica conforme o ambiente; None se não configurado.
+
+    ANALYTICS_STORAGE_PROVIDER (aws, azure ou gcp) + ANALYTICS_BUCKET usam o
+    ICloudStorage do provedor, com as credenciais nas variáveis padrão de cada um;
+    senão ANALYTICS_PATH aponta para um diretório local.
+    """
+    provider = os.getenv("ANALYTICS_STORAGE_PROVIDER")
+    if provider:
+        bucket = os.getenv("ANALYTICS_BUCKET")
+        if not bucket:
+            raise ValueError("ANALYTICS_BUCKET é obrigatório quando ANALYTICS_STORAGE_PROVIDER está definido.")
+        from cloud.storage import CloudStorageFactory
+        storage = CloudStorageFactory.get_storage_service(provider, {
+            "aws_access_key_id": os.getenv("AWS_ACCESS_KEY_ID"),
+            "aws_secret_access_key": os.getenv("AWS_SECRET_ACCESS_KEY"),
+            "aws_region_name": os.getenv("AWS_REGION", "us-east-1"),
+            "azure_connection_string": os.getenv("AZURE_STORAGE_CONNECTION_STRING"),
+            "gcp_credentials_path": os.getenv("GOOGLE_APPLICATION_CREDENTIALS"),
+        })
+        return CloudPartitionStore(storage, bucket)
+    path = os.getenv("ANALYTICS_PATH")
+    return LocalPartitionStore(path) if path else None
+
+
+class NFAnalytics:
+    """Exportação incremental das NFs para Parquet e agregações vetorizadas sobre os arquivos."""
+
+    def __init__(self, store: IPartitionStore, prefix: str = "nf_analytics"):
+        self.store = store
+        self.prefix = prefix
+
+    # --- Exportação ---
+
+    @contextmanager
+    def _writer(self, key: str):
+        with self.store.sink(key) as sink, pq.ParquetWriter(sink, NF_SCHEMA, compression="zstd") as writer:
+            yield writer
+
+    def export_records(self, records: Iterable[dict]) -> dict:
+        """Mescla NFs novas ou alteradas nas partições existentes (última versão por chave vence).
+
+        Retorna o número de NFs escritas por partição.
+        """
+        partitions: dict = {}
+        for nf in records:
+            row = to_row(nf)
+            if not row["cnpj_emitente"] or not isinstance(row["data_emissao"], datetime):
+                logger.warning("NF ignorada na exportação analítica: sem emitente ou data de emissão", extra={"chave": row["chave"]})
+                continue
+            try:
+                # Mesmo formato de export_month e das consultas; a pontuação quebraria o caminho
+                row["cnpj_emitente"] = normalize_cnpj(row["cnpj_emitente"])
+            except ValueError:
+                logger.warning("NF ignorada na exportação analítica: CNPJ do emitente inválido", extra={"chave": row["chave"]})
+                continue
+            ano_mes = row["data_emissao"].strftime("%Y-%m")
+            # Dicionário por chave: a última versão recebida nesta chamada vence
+            partition = partitions.setdefault((row["cnpj_emitente"], ano_mes), {})
+            partition.pop(row["chave"], None)
+            partition[row["chave"]] = row
+
+        written = {}
+        for (cnpj, ano_mes), rows_by_chave in partitions.items():
+            key = partition_key(self.prefix, cnpj, ano_mes)
+            rows = list(rows_by_chave.values())
+            new_table = pa.Table.from_pylist(rows, schema=NF_SCHEMA)
+            if self.store.exists(key):
+                existing = pq.read_table(self.store.open(key), schema=NF_SCHEMA)
+                keep = pc.invert(pc.is_in(existing["chave"], value_set=new_table["chave"].combine_chunks()))
+                new_table = pa.concat_tables([existing.filter(keep), new_table])
+            with self._writer(key) as writer:
+                writer.write_table(new_table, row_group_size=ROW_GROUP_SIZE)
+            written[key] = len(rows)
+        return written
+
+    def _clear_partition(self, key: str) -> None:
+        # NFs removidas do banco não podem continuar entrando nas agregações
+        if self.store.exists(key):
+            with self._writer(key):
+                pass
+
+    async def export_month(self, database: IStreamingDatabase, cnpj: str, year: int, month: int) -> int:
+        """Reconstrói a partição (cnpj, mês) a partir do banco, em streaming.
+
+        As NFs chegam pelo cursor do banco e cada lote de ROW_GROUP_SIZE é gravado
+        como um row group assim que fica completo: no máximo um lote fica em memória.
+        A montagem e a escrita dos row groups rodam em thread, fora do event loop. Um mês sem NFs sobrescreve a partição anterior, se houver, com uma partição
+        vazia. Retorna o total de NFs exportadas.
+        """
+        if not isinstance(database, IStreamingDatabase):
+            raise TypeError(f"{type(database).__name__} não suporta consultas por intervalo (IStreamingDatabase).")
+        cnpj = normalize_cnpj(cnpj)
+        start, end = month_bounds(year, month)
+        key = partition_key(self.prefix, cnpj, f"{year:04d}-{month:02d}")
+        stack = ExitStack()
+        writer = None
+
+        def write_rows(batch_rows: list) -> None:
+            # Conversão, compressão e escrita do row group rodam fora do event loop
+            nonlocal writer
+            if writer is None:
+                writer = stack.enter_context(self._writer(key))
+            writer.write_batch(pa.RecordBatch.from_pylist(batch_rows, schema=NF_SCHEMA))
+
+        rows = []
+        total = 0
+        try:
+            async for nf in database.stream_nfs(cnpj, start, end, fields=EXPORT_FIELDS):
+                rows.append(to_row(nf))
+                if len(rows) >= ROW_GROUP_SIZE:
+                    await asyncio.to_thread(write_rows, rows)
+                    total += len(rows)
+                    rows = []
+            if rows:
+                await asyncio.to_thread(write_rows, rows)
+                total += len(rows)
+        except BaseException:
+            # Repassa a exceção ao sink, que descarta a partição incompleta
+            await asyncio.to_thread(stack.__exit__, *sys.exc_info())
+            raise
+        # Fechar o writer grava o rodapé do Parquet e, em nuvem, faz o upload
+        await asyncio.to_thread(stack.close)
+        if not total:
+            await asyncio.to_thread(self._clear_partition, key)
+        logger.info("Partição analítica exportada", extra={"cnpj": cnpj, "ano_mes": f"{year:04d}-{month:02d}", "nfs": total})
+        return total
+
+    # --- Consulta ---
+
+    def _partitions(self, cnpj: Optional[str], start: Optional[datetime], end: Optional[datetime]) -> list:
+        if cnpj:
+            # O CNPJ vem do LLM: validado antes de virar prefixo de caminho
+            cnpj = normalize_cnpj(cnpj)
+        # Barra final: o CNPJ 123 não pode casar com as partições do CNPJ 1234
+        prefix = f"{self.prefix}/cnpj_emitente={cnpj}/" if cnpj else f"{self.prefix}/"
+        first_month = start.strftime("%Y-%m") if start else None
+        last_month = end.strftime("%Y-%m") if end else None
+        selected = []
+        for key in self.store.list(prefix):
+            parsed = parse_partition_key(key)
+            if parsed is None:
+                continue
+            key_cnpj, ano_mes = parsed
+            if cnpj and key_cnpj != cnpj:
+                continue
+            # Poda de partições pelo nome: meses fora do intervalo nem são abertos
+            if first_month and ano_mes < first_month:
+                continue
+            if last_month and (ano_mes > last_month or (ano_mes == last_month and end == datetime.strptime(ano_mes, "%Y-%m"))):
+                continue
+            selected.append((key, key_cnpj, ano_mes))
+        return selected
+
+    def aggregate(self, metric: str = "valor_total", agg: str = "sum", cnpj: str = None,
+                  start: datetime = None, end: datetime = None, group_by: list = None,
+                  where: dict = None) -> list[dict]:
+        """Agrega `metric` com `agg` sobre as NFs filtradas; [start, end) por data de emissão.
+
+        `where` aceita igualdade em colunas do esquema (ex: {"status": "autorizada"}).
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Métrica '{metric}' não suportada. Use uma de {METRICS}.")
+        if agg not in AGGREGATIONS:
+            raise ValueError(f"Agregação '{agg}' não suportada. Use uma de {AGGREGATIONS}.")
+        group_by = list(group_by or [])
+        for column in group_by:
+            if column not in GROUP_BY_COLUMNS:
+                raise ValueError(f"Agrupamento por '{column}' não suportado. Use {GROUP_BY_COLUMNS}.")
+        where = dict(where or {})
+        for column in where:
+            if column not in NF_SCHEMA.names:
+                raise ValueError(f"Filtro em coluna desconhecida: '{column}'.")
+
+        filters = [(column, "=", value) for column, value in where.items()]
+        if start:
+            filters.append(("data_emissao", ">=", pa.scalar(start, type=pa.timestamp("ms"))))
+        if end:
+            filters.append(("data_emissao", "<", pa.scalar(end, type=pa.timestamp("ms"))))
+        columns = sorted({metric} | {c for c in group_by if c != "ano_mes"})
+
+        tables = []
+        for key, key_cnpj, ano_mes in self._partitions(cnpj, start, end):
+            table = pq.read_table(self.store.open(key), columns=columns, filters=filters or None, schema=NF_SCHEMA)
+            if "ano_mes" in group_by:
+                table = table.append_column("ano_mes", pa.array([ano_mes] * table.num_rows, pa.string()))
+            tables.append(table)
+
+        if not tables:
+            return [] if group_by else [{metric: None if agg != "count" else 0, "nfs": 0}]
+        table = pa.concat_tables(tables)
+        if not group_by:
+            return [{metric: getattr(pc, agg)(table[metric]).as_py(), "nfs": table.num_rows}]
+        aggregations = [(metric, agg)] if agg == "count" else [(metric, agg), (metric, "count")]
+        grouped = table.group_by(group_by).aggregate(aggregations)
+        renames = {f"{metric}_{agg}": metric, f"{metric}_count": "nfs"} if agg != "count" else {f"{metric}_count": metric}
+        grouped = grouped.rename_columns([renames.get(name, name) for name in grouped.column_names])
+        return grouped.sort_by([(column, "ascending") for column in group_by]).to_pylist()
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def build_analytics_tool(analytics: NFAnalytics):
+    """Expõe NFAnalytics.aggregate como ferramenta do LLM Gateway."""
+    from llm_gateway.gateway import LLMTool
+
+    async def handler(metric: str = "valor_total", agg: str = "sum", cnpj: str = None,
+                      data_inicio: str = None, data_fim: str = None, group_by: list = None,
+                      status: str = None) -> list[dict]:
+        where = {"status": status} if status else None
+        # Leitura de Parquet é bloqueante; roda fora do event loop
+        return await asyncio.to_thread(
+            analytics.aggregate, metric=metric, agg=agg, cnpj=cnpj,
+            start=_parse_date(data_inicio), end=_parse_date(data_fim), group_by=group_by, where=where,
+        )
+
+    return LLMTool(
+        name="agregar_notas_fiscais",
+        description=(
+            "Calcula agregados (soma, média, mínimo, máximo, contagem) de valores de notas fiscais, "
+            "como total de ICMS de um CNPJ emitente em um período. Use para perguntas sobre totais, não para uma NF específica."
+        ),
+        parameters={
+            "type": "object",
+            "properties": {
+                "metric": {"type": "string", "enum": list(METRICS)},
+                "agg": {"type": "string", "enum": list(AGGREGATIONS)},
+                "cnpj": {"type": "string", "description": "CNPJ do emitente, apenas dígitos"},
+                "data_inicio": {"type": "string", "description": "Início do período (inclusive), AAAA-MM-DD"},
+                "data_fim": {"type": "string", "description": "Fim do período (exclusivo), AAAA-MM-DD"},
+                "group_by": {"type": "array", "items": {"type": "string", "enum": list(GROUP_BY_COLUMNS)}},
+                "status": {"type": "string", "description": "Filtra pelo status da NF"},
+            },
+            "required": ["metric", "agg"],
+        },
+        handler=handler,
+    )
@@ -0,0 +1,37 @@
+"""Carrega core_service.main:app offline, com o LLM substituído por um FakeLLM."""
+import os
+import tempfile
+
+from benchmarks.fakes import LatencyDistribution
+
+# O provedor 'llama' não faz chamadas de rede e é trocado pelo FakeLLM após o import
+OFFLINE_LLM_CONFIG = "provider: llama\napi_base: http://fake-llm.local\nmodel: fake\n"
+
+
+def write_offline_llm_config(directory: str) -> str:
+    path = os.path.join(directory, "llm_config.yaml")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(OFFLINE_LLM_CONFIG)
+    return path
+
+
+def use_offline_llm_config() -> str:
+    """Aponta LLM_CONFIG_PATH para uma configuração offline, se ainda não definida.
+
+    O gateway lê a configuração ao ser importado: chame antes de importar
+    llm_gateway ou core_service.
+    """
+    if "LLM_CONFIG_PATH" not in os.environ:
+        os.environ["LLM_CONFIG_PATH"] = write_offline_llm_config(tempfile.mkdtemp(prefix="nfagent-bench-"))
+    return os.environ["LLM_CONFIG_PATH"]
+
+
+def load_core_app(llm_latency: LatencyDistribution = None):
+    use_offline_llm_config()
+    from benchmarks.fake_llm import FakeLLM
+    from core_service.main import app
+    from llm_gateway.gateway import llm_gateway_instance
+
+    llm_gateway_instance.llm_service = FakeLLM(llm_latency)
+    llm_gateway_instance.provider = "fake"
+    return app
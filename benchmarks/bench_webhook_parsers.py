@@ -0,0 +1,106 @@
+"""Custo de parsing + verificação de assinatura por evento, por plataforma.
+
+Uso: python -m benchmarks.bench_webhook_parsers
+"""
+import hashlib
+import hmac
+import json
+import time
+import timeit
+
+from bot_framework.parsers import SlackParser, TeamsParser, DiscordParser, json_loads
+
+SLACK_SECRET = "segredo-benchmark"
+TEAMS_APP_ID = "00000000-0000-0000-0000-000000000001"
+ITERATIONS = 20000
+
+
+def _slack_case():
+    body = json.dumps({
+        "type": "event_callback",
+        "event_id": "Ev0BENCH",
+        "team_id": "T1",
+        "event": {"type": "message", "user": "U1", "text": "qual o status da NF 3519...?" * 4, "channel": "C1", "ts": "1.2"},
+    }).encode()
+    timestamp = str(int(time.time()))
+    signature = hmac.new(SLACK_SECRET.encode(), b"v0:" + timestamp.encode() + b":" + body, hashlib.sha256).hexdigest()
+    headers = {"x-slack-request-timestamp": timestamp, "x-slack-signature": f"v0={signature}"}
+    return SlackParser(signing_secret=SLACK_SECRET), headers, body
+
+
+def _teams_case():
+    body = json.dumps({
+        "type": "message",
+        "id": "1485983408511",
+        "timestamp": "2026-10-19T12:00:00.000Z",
+        "serviceUrl": "https://smba.trafficmanager.net/br/",
+        "channelId": "msteams",
+        "from": {"id": "29:1XJKJMvc5GBtc2JwZq0oj8tHZmzrQgFmB39ATiQWA85gQtHieVkKilBZ9XHoq9j7Zaqt7CZ-NJWi7me2kHTL3Bw", "name": "Usuário"},
+        "conversation": {"id": "a:17I0kl8EkpE1O9PH5TWrzrLNwnWWcfrU7QZjKR0WSfOpzbfcAg2IaydGElSo10tVr4C7Fc6GtieTJX663WuJCc1uA83n4CSrHSgGBj5XNYLcVlJAs2ZX8DbYBPck201w-"},
+        "recipient": {"id": "28:bot", "name": "NF Agent Pro"},
+        "text": "qual o status da NF 3519...?" * 4,
+    }).encode()
+    try:
+        import jwt
+        from cryptography.hazmat.primitives.asymmetric import rsa
+    except ImportError:
+        # Validação do JWT depende do PyJWT; sem ele mede-se apenas o parsing
+        return TeamsParser(), {}, body
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    token = jwt.encode({
+        "iss": "https://api.botframework.com", "aud": TEAMS_APP_ID,
+        "serviceurl": "https://smba.trafficmanager.net/br/", "exp": int(time.time()) + 3600,
+    }, private_key, algorithm="RS256")
+    parser = TeamsParser(app_id=TEAMS_APP_ID, jwks_client=StaticKeyClient(private_key.public_key()))
+    return parser, {"authorization": f"Bearer {token}"}, body
+
+
+class StaticKeyClient:
+    """Substitui o PyJWKClient: devolve sempre a mesma chave, sem buscar o JWKS na rede."""
+
+    def __init__(self, key):
+        self.key = key
+
+    def get_signing_key_from_jwt(self, token: str):
+        return self
+
+
+def _discord_case():
+    body = json.dumps({
+        "type": 2,
+        "id": "786008729715212338",
+        "application_id": "775799577604522054",
+        "token": "A_UNIQUE_TOKEN" * 8,
+        "channel_id": "772908445358620702",
+        "member": {"user": {"id": "53908232506183680", "username": "usuario"}},
+        "data": {"name": "nf", "options": [{"name": "pergunta", "value": "qual o status da NF 3519...?" * 4}]},
+    }).encode()
+    try:
+        from nacl.signing import SigningKey
+    except ImportError:
+        # Verificação Ed25519 depende do PyNaCl; sem ele mede-se apenas o parsing
+        return DiscordParser(), {}, body
+    signing_key = SigningKey.generate()
+    timestamp = str(int(time.time()))
+    signature = signing_key.sign(timestamp.encode() + body).signature.hex()
+    headers = {"x-signature-timestamp": timestamp, "x-signature-ed25519": signature}
+    return DiscordParser(public_key=signing_key.verify_key.encode().hex()), headers, body
+
+
+
+
+def run(iterations: int = ITERATIONS) -> dict:
+    results = {"json_backend": json_loads.__module__, "iterations": iterations, "platforms": {}}
+    for platform, case in (("slack", _slack_case), ("teams", _teams_case), ("discord", _discord_case)):
+        parser, headers, body = case()
+        elapsed = min(timeit.repeat(lambda: parser.parse(headers, body), number=iterations, repeat=3))
+        results["platforms"][platform] = {
+            "body_bytes": len(body),
+            "signature_verified": parser.verifies_signature,
+            "us_per_event": round(elapsed / iterations * 1e6, 3),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
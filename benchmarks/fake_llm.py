@@ -0,0 +1,25 @@
+"""FakeLLM: provedor do gateway com latência configurável e sem chamadas de rede.
+
+Importar este módulo importa o llm_gateway, que lê o llm_config.yaml; rode
+benchmarks.app.use_offline_llm_config() antes (load_core_app já faz isso).
+"""
+from typing import AsyncIterator
+
+from benchmarks.fakes import LatencyDistribution
+from llm_gateway.gateway import LLMInterface
+
+
+class FakeLLM(LLMInterface):
+    def __init__(self, latency: LatencyDistribution = None, response: str = "Resposta simulada sobre a NF."):
+        self.latency = latency or LatencyDistribution()
+        self.response = response
+
+    async def generate_response(self, prompt: str, **kwargs) -> str:
+        await self.latency.wait()
+        return self.response
+
+    async def stream_response(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        # A latência configurada representa o tempo até o primeiro token
+        await self.latency.wait()
+        for token in self.response.split(" "):
+            yield token + " "
@@ -0,0 +1,131 @@
+"""Clientes falsos (coleção do MongoDB, S3 e storage) com distribuições de latência
+configuráveis. Os adaptadores reais (MongoRepository, AWSStorage) rodam sobre eles,
+então os benchmarks medem o código do repositório e não apenas o fake.
+
+Especificação de latência em segundos, no formato "tipo:param1:param2":
+    constant:0.05        sempre 50ms
+    uniform:0.01:0.1     uniforme entre 10ms e 100ms
+    normal:0.5:0.1       média 500ms, desvio 100ms (truncada em zero)
+    lognormal:0.8:0.4    mediana 800ms, sigma 0.4 (cauda longa, típica de LLMs)
+"""
+import asyncio
+import io
+import math
+import random
+import time
+from typing import Optional
+
+from cloud.storage import ICloudStorage
+from observability.metrics import STORAGE_OPERATION_SECONDS, timed
+
+
+class LatencyDistribution:
+    KINDS = ("constant", "uniform", "normal", "lognormal")
+
+    def __init__(self, kind: str = "constant", a: float = 0.0, b: float = 0.0, seed: int = None):
+        if kind not in self.KINDS:
+            raise ValueError(f"Distribuição de latência desconhecida: {kind}")
+        self.kind = kind
+        self.a = a
+        self.b = b
+        self.random = random.Random(seed)
+
+    @classmethod
+    def from_spec(cls, spec: str, seed: int = None) -> "LatencyDistribution":
+        kind, *params = spec.split(":")
+        values = [float(param) for param in params] + [0.0, 0.0]
+        return cls(kind, values[0], values[1], seed=seed)
+
+    def sample(self) -> float:
+        if self.kind == "constant":
+            return self.a
+        if self.kind == "uniform":
+            return self.random.uniform(self.a, self.b)
+        if self.kind == "normal":
+            return max(0.0, self.random.gauss(self.a, self.b))
+        return self.random.lognormvariate(math.log(self.a), self.b) if self.a > 0 else 0.0
+
+    async def wait(self) -> None:
+        delay = self.sample()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def wait_sync(self) -> None:
+        delay = self.sample()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def sample_nf(chave: str, items_per_nf: int = 10) -> dict:
+    return {
+        "chave": chave, "numero": "1", "serie": "1", "status": "autorizada",
+        "emitente": {"cnpj": "12345678000199", "razao_social": "Empresa"},
+        "destinatario": {"cnpj": "98765432000155"},
+        "valor_total": 1500.0, "valor_icms": 180.0,
+        "itens": [{"item": i, "descricao": f"Produto {i}", "valor": 10.0 * i} for i in range(items_per_nf)],
+    }
+
+
+class FakeMongoCollection:
+    """Subconjunto assíncrono da coleção do Motor usado pelo MongoRepository.get_nf."""
+
+    def __init__(self, latency: LatencyDistribution = None, items_per_nf: int = 10):
+        self.latency = latency or LatencyDistribution()
+        self.items_per_nf = items_per_nf
+        self.name = "notas_fiscais"
+
+    async def find_one(self, query: dict, projection: Optional[dict] = None) -> dict:
+        await self.latency.wait()
+        document = sample_nf(query["chave"], self.items_per_nf)
+        included = [field for field, flag in (projection or {}).items() if flag and field != "_id"]
+        if not included:
+            return document
+        # Projeção rasa: campos aninhados ("emitente.cnpj") trazem o subdocumento inteiro
+        return {field.split(".")[0]: document[field.split(".")[0]] for field in included if field.split(".")[0] in document}
+
+
+class FakeS3Client:
+    """Subconjunto do cliente boto3 de S3 usado pelo AWSStorage."""
+
+    def __init__(self, latency: LatencyDistribution = None):
+        self.latency = latency or LatencyDistribution()
+        self.objects = {}
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes) -> dict:
+        self.latency.wait_sync()
+        self.objects[(Bucket, Key)] = Body
+        return {}
+
+    def get_object(self, Bucket: str, Key: str) -> dict:
+        self.latency.wait_sync()
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def generate_presigned_url(self, method: str, Params: dict, ExpiresIn: int) -> str:
+        return f"https://{Params['Bucket']}.s3.fake/{Params['Key']}?expires={ExpiresIn}"
+
+
+class FakeStorage(ICloudStorage):
+    def __init__(self, latency: LatencyDistribution = None):
+        self.latency = latency or LatencyDistribution()
+        self.objects = {}
+
+    @timed(STORAGE_OPERATION_SECONDS, provider="fake", operation="upload_file")
+    def upload_file(self, bucket_name: str, file_name: str, file_content: bytes) -> str:
+        self.latency.wait_sync()
+        self.objects[(bucket_name, file_name)] = file_content
+        return f"fake://{bucket_name}/{file_name}"
+
+    @timed(STORAGE_OPERATION_SECONDS, provider="fake", operation="generate_presigned_url")
+    def generate_presigned_url(self, bucket_name: str, file_name: str, expiration: int = 3600) -> str:
+        self.latency.wait_sync()
+        return f"fake://{bucket_name}/{file_name}?expires={expiration}"
+
+    @timed(STORAGE_OPERATION_SECONDS, provider="fake", operation="download_file")
+    def download_file(self, bucket_name: str, file_name: str) -> bytes:
+        self.latency.wait_sync()
+        return self.objects[(bucket_name, file_name)]
+
+    @timed(STORAGE_OPERATION_SECONDS, provider="fake", operation="list_files")
+    def list_files(self, bucket_name: str, prefix: str = "") -> list[str]:
+        self.latency.wait_sync()
+        return sorted(name for bucket, name in self.objects if bucket == bucket_name and name.startswith(prefix))
@@ -0,0 +1,69 @@
+"""Cenário de carga ponta a ponta contra core_service.main:app, em processo.
+
+Usuários virtuais concorrentes disparam uma mistura ponderada de rotas até
+completar o total de requisições. Para carga via rede, use benchmarks/locustfile.py.
+"""
+import asyncio
+import random
+import time
+
+import httpx
+
+from benchmarks.app import load_core_app
+from benchmarks.fakes import LatencyDistribution
+
+API_HEADERS = {"X-API-KEY": "dev_key_123"}
+NF_CONTENT = "<nfeProc><NFe><infNFe Id='NFe35190000000000000000550010000000011000000010'>...</infNFe></NFe></nfeProc>"
+
+# (peso, método, rota, corpo)
+SCENARIO = [
+    (5, "POST", "/llm/chat/invoke", {"prompt": "Qual o status da NF 35190000000000000000550010000000011000000010?"}),
+    (3, "POST", "/nf", {"content": NF_CONTENT}),
+    (1, "POST", "/batch", {"nf_requests": [{"content": NF_CONTENT}] * 20}),
+    (1, "GET", "/sefaz_codes", None),
+]
+
+
+def _percentile(values: list, p: float) -> float:
+    index = min(len(values) - 1, int(p * len(values)))
+    return values[index]
+
+
+async def _run_async(total_requests: int, concurrency: int, llm_latency: LatencyDistribution, seed: int) -> dict:
+    app = load_core_app(llm_latency)
+    rng = random.Random(seed)
+    weights = [weight for weight, *_ in SCENARIO]
+    plan = rng.choices(SCENARIO, weights=weights, k=total_requests)
+    latencies = []
+    errors = 0
+    cursor = 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", headers=API_HEADERS) as client:
+
+        async def virtual_user():
+            nonlocal cursor, errors
+            while cursor < len(plan):
+                _, method, route, body = plan[cursor]
+                cursor += 1
+                start = time.perf_counter()
+                response = await client.request(method, route, json=body)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(virtual_user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "load.throughput": {"value": round(total_requests / elapsed, 1), "unit": "rps", "better": "higher"},
+        "load.latency_p50": {"value": round(_percentile(latencies, 0.50) * 1000, 3), "unit": "ms", "better": "lower"},
+        "load.latency_p95": {"value": round(_percentile(latencies, 0.95) * 1000, 3), "unit": "ms", "better": "lower"},
+        "load.latency_p99": {"value": round(_percentile(latencies, 0.99) * 1000, 3), "unit": "ms", "better": "lower"},
+        "load.errors": {"value": errors, "unit": "count", "better": "lower"},
+    }
+
+
+def run(total_requests: int = 2000, concurrency: int = 50, llm_latency: str = "lognormal:0.02:0.5", seed: int = 42) -> dict:
+    return asyncio.run(_run_async(total_requests, concurrency, LatencyDistribution.from_spec(llm_latency, seed=seed), seed))
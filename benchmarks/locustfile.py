@@ -0,0 +1,21 @@
+"""Carga via rede com Locust, usando o mesmo cenário de benchmarks/load.py.
+
+Uso: locust -f benchmarks/locustfile.py --host http://localhost:8002
+"""
+from locust import HttpUser, between
+
+from benchmarks.load import API_HEADERS, SCENARIO
+
+
+def _make_task(method: str, route: str, body: dict):
+    def call(user):
+        user.client.request(method, route, json=body, name=route)
+    return call
+
+
+class NFAgentUser(HttpUser):
+    wait_time = between(0.5, 2)
+    tasks = {_make_task(method, route, body): weight for weight, method, route, body in SCENARIO}
+
+    def on_start(self):
+        self.client.headers.update(API_HEADERS)
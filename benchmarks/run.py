@@ -0,0 +1,134 @@
+"""Executa a suíte de benchmarks offline e compara com os baselines salvos.
+
+Uso:
+    python -m benchmarks.run                      # micro + carga, compara com baselines.json
+    python -m benchmarks.run --suite micro --output resultados.json
+    python -m benchmarks.run --update-baseline    # grava os resultados atuais como baseline
+
+O baselines.json guarda, por suíte, os parâmetros da execução e as métricas. Só há
+comparação com parâmetros idênticos: números de outra configuração não são comparáveis.
+
+Sai com código 1 se alguma métrica regredir além da tolerância e 2 se os parâmetros
+diferirem dos do baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+DEFAULT_TOLERANCE = 0.5
+
+
+def compare(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """Retorna a lista de regressões: métricas piores que o baseline além da tolerância."""
+    regressions = []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if current["better"] == "lower":
+            limit = reference["value"] * (1 + tolerance)
+            regressed = current["value"] > limit
+        else:
+            limit = reference["value"] * (1 - tolerance)
+            regressed = current["value"] < limit
+        if regressed:
+            regressions.append({"metric": name, "baseline": reference["value"], "current": current["value"], "limit": round(limit, 3), "unit": current["unit"]})
+    return regressions
+
+
+def params_mismatch(suite: str, params: dict, baseline: dict) -> list:
+    """Diferenças entre os parâmetros atuais e os gravados no baseline da suíte."""
+    reference = baseline.get(suite, {}).get("params", {})
+    return [
+        f"{suite}.{name}: baseline={reference.get(name)!r}, atual={value!r}"
+        for name, value in params.items() if reference.get(name) != value
+    ]
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks do NF Agent Pro")
+    parser.add_argument("--suite", choices=["all", "micro", "load"], default="all")
+    parser.add_argument("--iterations", type=int, default=2000, help="Iterações por micro-benchmark")
+    parser.add_argument("--requests", type=int, default=2000, help="Total de requisições no cenário de carga")
+    parser.add_argument("--concurrency", type=int, default=50, help="Usuários virtuais no cenário de carga")
+    parser.add_argument("--llm-latency", default="lognormal:0.02:0.5", help="Distribuição de latência do FakeLLM (ver benchmarks/fakes.py)")
+    parser.add_argument("--db-latency", default="constant:0", help="Latência da coleção falsa do MongoDB nos micro-benchmarks")
+    parser.add_argument("--storage-latency", default="constant:0", help="Latência do cliente S3 falso nos micro-benchmarks")
+    parser.add_argument("--output", help="Arquivo JSON para os resultados (padrão: stdout)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Regressão relativa aceita (0.5 = 50%%)")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    # Logs de cada requisição distorcem as medições
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    from benchmarks import load, micro
+
+    suites = ["micro", "load"] if args.suite == "all" else [args.suite]
+    params = {
+        "micro": {"iterations": args.iterations, "db_latency": args.db_latency, "storage_latency": args.storage_latency},
+        "load": {"total_requests": args.requests, "concurrency": args.concurrency, "llm_latency": args.llm_latency},
+    }
+    runners = {"micro": micro.run, "load": load.run}
+    suite_results = {suite: runners[suite](**params[suite]) for suite in suites}
+    results = {name: value for suite in suites for name, value in suite_results[suite].items()}
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "params": {suite: params[suite] for suite in suites},
+        "results": results,
+    }
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    mismatches = []
+    if args.update_baseline:
+        for suite in suites:
+            baseline[suite] = {"params": params[suite], "metrics": suite_results[suite]}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+    else:
+        report["regressions"] = []
+        for suite in suites:
+            if suite not in baseline:
+                continue
+            suite_mismatches = params_mismatch(suite, params[suite], baseline)
+            if suite_mismatches:
+                mismatches.extend(suite_mismatches)
+                continue
+            report["regressions"].extend(compare(suite_results[suite], baseline[suite]["metrics"], args.tolerance))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if mismatches:
+        print("Parâmetros diferentes dos do baseline; comparação não realizada (rode com os mesmos parâmetros ou use --update-baseline):", file=sys.stderr)
+        for mismatch in mismatches:
+            print(f"  {mismatch}", file=sys.stderr)
+        return 2
+
+    regressions = report.get("regressions", [])
+    for regression in regressions:
+        print(f"REGRESSÃO {regression['metric']}: {regression['current']} {regression['unit']} (baseline {regression['baseline']}, limite {regression['limit']})", file=sys.stderr)
+    if results.get("load.errors", {}).get("value"):
+        print(f"Cenário de carga terminou com {results['load.errors']['value']} erros", file=sys.stderr)
+        return 1
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from observability.log import get_logger
+from observability.metrics import QUEUE_DEPTH, WEBHOOK_EVENTS, WEBHOOK_PROCESSING_SECONDS
+
+logger = get_logger(__name__)
+
+# Teams e Slack reenviam o webhook se não houver resposta em ~3s. O handler HTTP
+# apenas valida, enfileira e responde; os workers abaixo chamam o LLM Gateway e
+# devolvem a resposta pela plataforma de origem.
+
+DEFAULT_QUEUE_MAXSIZE = 1000
+DEFAULT_WORKERS = 4
+DEFAULT_DEDUP_TTL_SECONDS = 600
+DEFAULT_DEDUP_MAX_ENTRIES = 10000
+DEFAULT_DRAIN_TIMEOUT_SECONDS = 30
+LATENCY_WINDOW = 1000
+
+
+@dataclass
+class BotEvent:
+    """Mensagem normalizada, independente da plataforma (ver bot_framework/parsers.py)."""
+    event_id: str
+    platform: str
+    user_id: str
+    text: Optional[str] = None
+    conversation_id: Optional[str] = None
+    reply_url: Optional[str] = None  # Endpoint de resposta quando a plataforma fornece um (Teams, Discord)
+    received_at: float = 0.0
+
+
+class IPlatformSender(ABC):
+    @abstractmethod
+    async def send_message(self, event: BotEvent, text: str) -> None:
+        pass
+
+
+class ConsolePlatformSender(IPlatformSender):
+    """Sender local: apenas registra a resposta, útil para desenvolvimento e testes."""
+
+    async def send_message(self, event: BotEvent, text: str) -> None:
+        logger.info("Resposta gerada", extra={"platform": event.platform, "user_id": event.user_id, "event_id": event.event_id, "text": text})
+
+
+async def _default_handler(event: BotEvent) -> str:
+    # Import tardio: o gateway carrega o llm_config.yaml ao ser importado.
+    from llm_gateway.gateway import llm_gateway_instance
+    return await llm_gateway_instance.get_response(event.text or "")
+
+
+class WebhookDispatcher:
+    """Fila em memória com pool de workers e deduplicação idempotente por event_id."""
+
+    def __init__(
+        self,
+        handler: Callable[[BotEvent], Awaitable[str]] = _default_handler,
+        workers: int = DEFAULT_WORKERS,
+        maxsize: int = DEFAULT_QUEUE_MAXSIZE,
+        dedup_ttl: float = DEFAULT_DEDUP_TTL_SECONDS,
+        dedup_max_entries: int = DEFAULT_DEDUP_MAX_ENTRIES,
+        name: str = "webhook",
+    ):
+        self.handler = handler
+        self.workers = workers
+        self.maxsize = maxsize
+        self.dedup_ttl = dedup_ttl
+        self.dedup_max_entries = dedup_max_entries
+        self.name = name
+        self.senders: dict[str, IPlatformSender] = {}
+        self.default_sender: IPlatformSender = ConsolePlatformSender()
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        self._seen: OrderedDict[str, float] = OrderedDict()
+        self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.processed = 0
+        self.failed = 0
+        self.duplicates = 0
+        self.rejected = 0
+
+    def register_sender(self, platform: str, sender: IPlatformSender) -> None:
+        self.senders[platform.lower()] = sender
+
+    def get_sender(self, platform: str) -> IPlatformSender:
+        return self.senders.get(platform.lower(), self.default_sender)
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+            QUEUE_DEPTH.labels(queue=self.name).set_function(self._queue.qsize)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self, drain_timeout: float = DEFAULT_DRAIN_TIMEOUT_SECONDS) -> None:
+        """Aguarda a fila esvaziar (até `drain_timeout` segundos) e encerra os workers."""
+        if self._queue is not None and self.running:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "Fila não esvaziou dentro do prazo; eventos pendentes serão descartados",
+                    extra={"queue": self.name, "pending": self._queue.qsize(), "drain_timeout": drain_timeout},
+                )
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _is_duplicate(self, event_id: str, now: float) -> bool:
+        while self._seen:
+            oldest_id, seen_at = next(iter(self._seen.items()))
+            if now - seen_at < self.dedup_ttl and len(self._seen) < self.dedup_max_entries:
+                break
+            self._seen.popitem(last=False)
+        if event_id in self._seen:
+            return True
+        self._seen[event_id] = now
+        return False
+
+    async def enqueue(self, event: BotEvent) -> str:
+        """Enfileira o evento sem bloquear. Retorna 'queued', 'duplicate' ou 'rejected'."""
+        await self.start()
+        now = time.monotonic()
+        if self._is_duplicate(event.event_id, now):
+            self.duplicates += 1
+            WEBHOOK_EVENTS.labels(platform=event.platform, status="duplicate").inc()
+            return "duplicate"
+        event.received_at = event.received_at or now
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Libera o id para que o reenvio da plataforma possa ser aceito depois.
+            self._seen.pop(event.event_id, None)
+            self.rejected += 1
+            WEBHOOK_EVENTS.labels(platform=event.platform, status="rejected").inc()
+            return "rejected"
+        WEBHOOK_EVENTS.labels(platform=event.platform, status="queued").inc()
+        return "queued"
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            event = await self._queue.get()
+            try:
+                reply = await self.handler(event)
+                await self.get_sender(event.platform).send_message(event, reply)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.exception(
+                    "Erro ao processar evento",
+                    extra={"worker_id": worker_id, "event_id": event.event_id, "platform": event.platform, "error": str(e)},
+                )
+            finally:
+                elapsed = time.monotonic() - event.received_at
+                self._latencies.append(elapsed)
+                WEBHOOK_PROCESSING_SECONDS.labels(platform=event.platform).observe(elapsed)
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 4)
+
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_maxsize": self.maxsize,
+            "workers": len([task for task in self._tasks if not task.done()]),
+            "processed": self.processed,
+            "failed": self.failed,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "latency_seconds": {
+                "samples": len(latencies),
+                "avg": round(sum(latencies) / len(latencies), 4) if latencies else None,
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "max": round(latencies[-1], 4) if latencies else None,
+            },
+        }
@@ -0,0 +1,309 @@
+import hashlib
+import hmac
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+from bot_framework.dispatcher import BotEvent
+from observability.log import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:  # orjson é opcional; json da stdlib também aceita bytes
+    json_loads = json.loads
+
+# Cada parser recebe o corpo bruto (bytes) lido uma única vez do request: a
+# assinatura é verificada sobre esses bytes e o JSON é decodificado direto deles.
+
+SLACK_MAX_SKEW_SECONDS = 300
+BOT_FRAMEWORK_JWKS_URL = "https://login.botframework.com/v1/.well-known/keys"
+BOT_FRAMEWORK_ISSUER = "https://api.botframework.com"
+BOT_FRAMEWORK_CLOCK_SKEW_SECONDS = 300
+
+
+class SignatureError(Exception):
+    pass
+
+
+def _object(data: dict, field: str) -> dict:
+    """Subobjeto opcional do payload; formato inesperado vira ValueError (HTTP 400)."""
+    value = data.get(field)
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise ValueError(f"Campo '{field}' deve ser um objeto JSON.")
+    return value
+
+
+def _required_id(data: dict, field: str) -> str:
+    value = data[field]
+    if not isinstance(value, (str, int)) or isinstance(value, bool):
+        raise ValueError(f"Campo '{field}' deve ser texto ou número.")
+    return str(value)
+
+
+@dataclass
+class ParseResult:
+    event: Optional[BotEvent] = None
+    response: Optional[dict] = None  # Resposta imediata exigida pela plataforma (challenge, ping, ack)
+
+
+class IPayloadParser(ABC):
+    platform: str = ""
+    secret_env: str = ""
+
+    def _warn_unverified(self) -> None:
+        # Sem segredo qualquer um pode disparar chamadas ao LLM em nome da plataforma
+        logger.warning(
+            "Verificação de assinatura desativada: segredo da plataforma não configurado",
+            extra={"platform": self.platform, "env": self.secret_env},
+        )
+
+    @abstractmethod
+    def verify(self, headers: Mapping[str, str], body: bytes) -> None:
+        pass
+
+    @abstractmethod
+    def normalize(self, data: dict) -> ParseResult:
+        pass
+
+    @property
+    def verifies_signature(self) -> bool:
+        return False
+
+    def parse(self, headers: Mapping[str, str], body: bytes) -> ParseResult:
+        self.verify(headers, body)
+        return self._parse_body(body)
+
+    def _parse_body(self, body: bytes) -> ParseResult:
+        try:
+            data = json_loads(body)
+        except ValueError as e:
+            raise ValueError(f"Payload JSON inválido de {self.platform}: {e}")
+        if not isinstance(data, dict):
+            raise ValueError(f"Payload de {self.platform} deve ser um objeto JSON.")
+        if "user_id" in data:
+            # Formato interno simplificado (testes locais e carga)
+            return ParseResult(event=BotEvent(
+                event_id=str(data.get("event_id") or hashlib.sha256(body).hexdigest()),
+                platform=self.platform,
+                user_id=str(data["user_id"]),
+                text=data.get("text"),
+                conversation_id=data.get("conversation_id"),
+            ))
+        return self.normalize(data)
+
+
+class TeamsParser(IPayloadParser):
+    """Activities do Bot Framework (Teams), autenticadas pelo JWT do Bot Connector.
+
+    O Bot Connector envia `Authorization: Bearer <jwt>` emitido para o App ID do bot; a
+    resposta do LLM segue depois, de forma assíncrona, para o serviceUrl da activity.
+    Outgoing webhooks do Teams (HMAC, resposta síncrona no próprio HTTP) não são suportados.
+    """
+    platform = "teams"
+    secret_env = "TEAMS_APP_ID"
+
+    def __init__(self, app_id: Optional[str] = None, jwks_client=None):
+        self.app_id = app_id or None
+        self.jwks_client = None
+        if self.app_id is None:
+            self._warn_unverified()
+            return
+        try:
+            import jwt
+        except ImportError:
+            raise RuntimeError("TEAMS_APP_ID configurado, mas o PyJWT não está instalado (pip install 'pyjwt[crypto]').")
+        # PyJWKClient guarda as chaves em cache; a rede só é usada na rotação de chaves
+        self.jwks_client = jwks_client or jwt.PyJWKClient(BOT_FRAMEWORK_JWKS_URL, cache_keys=True)
+
+    @property
+    def verifies_signature(self) -> bool:
+        return self.app_id is not None
+
+    def _claims(self, headers: Mapping[str, str]) -> Optional[dict]:
+        if self.app_id is None:
+            return None
+        import jwt
+        auth = headers.get("authorization", "")
+        if not auth.startswith("Bearer "):
+            raise SignatureError("Token Bearer do Bot Framework ausente.")
+        token = auth[7:]
+        try:
+            key = self.jwks_client.get_signing_key_from_jwt(token).key
+            return jwt.decode(
+                token, key, algorithms=["RS256"], audience=self.app_id, issuer=BOT_FRAMEWORK_ISSUER,
+                leeway=BOT_FRAMEWORK_CLOCK_SKEW_SECONDS,
+            )
+        except jwt.PyJWTError as e:
+            raise SignatureError(f"Token do Bot Framework inválido: {e}")
+
+    def verify(self, headers: Mapping[str, str], body: bytes) -> None:
+        self._claims(headers)
+
+    def parse(self, headers: Mapping[str, str], body: bytes) -> ParseResult:
+        claims = self._claims(headers)
+        result = self._parse_body(body)
+        if claims is not None and result.event is not None and result.event.reply_url:
+            # O token vale só para o serviceUrl em que foi emitido: impede desviar a resposta
+            service_url = str(claims.get("serviceurl", "")).rstrip("/")
+            if not service_url or not result.event.reply_url.startswith(service_url + "/"):
+                raise SignatureError("serviceUrl da activity não confere com o token do Bot Framework.")
+        return result
+
+    def normalize(self, data: dict) -> ParseResult:
+        if data.get("type") != "message":
+            return ParseResult()
+        conversation_id = _object(data, "conversation").get("id")
+        service_url = data.get("serviceUrl")
+        reply_url = None
+        if service_url and conversation_id and data.get("id"):
+            reply_url = f"{service_url.rstrip('/')}/v3/conversations/{conversation_id}/activities/{data['id']}"
+        return ParseResult(event=BotEvent(
+            event_id=_required_id(data, "id"),
+            platform=self.platform,
+            user_id=_object(data, "from").get("id", ""),
+            text=data.get("text"),
+            conversation_id=conversation_id,
+            reply_url=reply_url,
+        ))
+
+
+class SlackParser(IPayloadParser):
+    """Slack Events API, com verificação do X-Slack-Signature (v0)."""
+    platform = "slack"
+    secret_env = "SLACK_SIGNING_SECRET"
+
+    def __init__(self, signing_secret: Optional[str] = None):
+        self.key = signing_secret.encode() if signing_secret else None
+        if self.key is None:
+            self._warn_unverified()
+
+    @property
+    def verifies_signature(self) -> bool:
+        return self.key is not None
+
+    def verify(self, headers: Mapping[str, str], body: bytes) -> None:
+        if self.key is None:
+            return
+        timestamp = headers.get("x-slack-request-timestamp", "")
+        signature = headers.get("x-slack-signature", "")
+        if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > SLACK_MAX_SKEW_SECONDS:
+            raise SignatureError("Timestamp do Slack ausente ou expirado.")
+        # update() incremental evita concatenar o corpo em um novo buffer
+        mac = hmac.new(self.key, b"v0:" + timestamp.encode() + b":", hashlib.sha256)
+        mac.update(body)
+        if not hmac.compare_digest(signature, "v0=" + mac.hexdigest()):
+            raise SignatureError("Assinatura do Slack inválida.")
+
+    def normalize(self, data: dict) -> ParseResult:
+        payload_type = data.get("type")
+        if payload_type == "url_verification":
+            return ParseResult(response={"challenge": data.get("challenge")})
+        if payload_type != "event_callback":
+            return ParseResult()
+        event = _object(data, "event")
+        # Ignora mensagens de bots (inclusive as nossas) e edições
+        if event.get("type") not in ("message", "app_mention") or event.get("bot_id") or event.get("subtype"):
+            return ParseResult()
+        return ParseResult(event=BotEvent(
+            event_id=_required_id(data, "event_id"),
+            platform=self.platform,
+            user_id=event.get("user", ""),
+            text=event.get("text"),
+            conversation_id=event.get("channel"),
+        ))
+
+
+class DiscordParser(IPayloadParser):
+    """Interactions do Discord (slash commands), com verificação Ed25519."""
+    platform = "discord"
+    secret_env = "DISCORD_PUBLIC_KEY"
+    PING = 1
+    APPLICATION_COMMAND = 2
+    PONG = 1
+    DEFERRED_CHANNEL_MESSAGE = 5
+
+    def __init__(self, public_key: Optional[str] = None):
+        self.verify_key = None
+        if not public_key:
+            self._warn_unverified()
+            return
+        try:
+            from nacl.signing import VerifyKey
+        except ImportError:
+            raise RuntimeError("DISCORD_PUBLIC_KEY configurada, mas o PyNaCl não está instalado (pip install pynacl).")
+        self.verify_key = VerifyKey(bytes.fromhex(public_key))
+
+    @property
+    def verifies_signature(self) -> bool:
+        return self.verify_key is not None
+
+    def verify(self, headers: Mapping[str, str], body: bytes) -> None:
+        if self.verify_key is None:
+            return
+        from nacl.exceptions import BadSignatureError
+        timestamp = headers.get("x-signature-timestamp", "")
+        signature = headers.get("x-signature-ed25519", "")
+        try:
+            # Ed25519 não tem API incremental: a mensagem assinada é timestamp + corpo
+            self.verify_key.verify(timestamp.encode() + body, bytes.fromhex(signature))
+        except (BadSignatureError, ValueError):
+            raise SignatureError("Assinatura do Discord inválida.")
+
+    def normalize(self, data: dict) -> ParseResult:
+        interaction_type = data.get("type")
+        if interaction_type == self.PING:
+            return ParseResult(response={"type": self.PONG})
+        if interaction_type != self.APPLICATION_COMMAND:
+            return ParseResult()
+        command = _object(data, "data")
+        options = command.get("options") or []
+        if not isinstance(options, list) or not all(isinstance(option, dict) for option in options):
+            raise ValueError("Campo 'options' deve ser uma lista de objetos.")
+        text = " ".join(str(option.get("value", "")) for option in options) or command.get("name")
+        user = _object(_object(data, "member"), "user") or _object(data, "user")
+        return ParseResult(
+            event=BotEvent(
+                event_id=_required_id(data, "id"),
+                platform=self.platform,
+                user_id=user.get("id", ""),
+                text=text,
+                conversation_id=data.get("channel_id"),
+                reply_url=f"https://discord.com/api/v10/webhooks/{data.get('application_id')}/{data.get('token')}",
+            ),
+            # O Discord exige resposta em 3s; a resposta do LLM vai como follow-up
+            response={"type": self.DEFERRED_CHANNEL_MESSAGE},
+        )
+
+
+class PayloadParserFactory:
+    PLATFORMS = ("teams", "slack", "discord")
+    _parsers: dict = {}
+
+    @staticmethod
+    def get_parser(platform: str) -> IPayloadParser:
+        platform = platform.lower()
+        parser = PayloadParserFactory._parsers.get(platform)
+        if parser is not None:
+            return parser
+        if platform == "teams":
+            parser = TeamsParser(app_id=os.getenv("TEAMS_APP_ID"))
+        elif platform == "slack":
+            parser = SlackParser(signing_secret=os.getenv("SLACK_SIGNING_SECRET"))
+        elif platform == "discord":
+            parser = DiscordParser(public_key=os.getenv("DISCORD_PUBLIC_KEY"))
+        else:
+            raise ValueError(f"Plataforma '{platform}' não suportada.")
+        PayloadParserFactory._parsers[platform] = parser
+        return parser
+
+    @staticmethod
+    def register_parser(platform: str, parser: IPayloadParser) -> None:
+        PayloadParserFactory._parsers[platform.lower()] = parser
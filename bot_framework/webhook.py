@@ -1,8 +1,14 @@
 from fastapi import FastAPI, Request, File, UploadFile, HTTPException, status
-from pydantic import BaseModel
 import shutil
 import os
 
+from bot_framework.dispatcher import WebhookDispatcher
+from bot_framework.parsers import PayloadParserFactory, SignatureError
+from observability.log import get_logger
+from observability.metrics import PrometheusMiddleware, metrics_router
+
+logger = get_logger(__name__)
+
 UPLOAD_DIR = "./temp_uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
@@ -11,33 +17,59 @@ app_bot = FastAPI(
     description="Recebe e processa webhooks de plataformas de Bot (Teams, Slack, Discord)",
     version="0.1.0"
 )
+app_bot.add_middleware(PrometheusMiddleware)
+app_bot.include_router(metrics_router)
 
-class WebhookPayload(BaseModel):
-    platform: str
-    user_id: str
-    text: str = None
+# Fila de processamento em segundo plano. Para enviar respostas reais, registre um
+# sender por plataforma: dispatcher.register_sender("slack", MeuSlackSender())
+dispatcher = WebhookDispatcher()
 
-@app_bot.post("/webhook/{platform}", summary="Recebe webhooks de bots")
-async def handle_webhook(platform: str, request: Request, payload: WebhookPayload = None):
-    if platform.lower() not in ["teams", "slack", "discord"]:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Plataforma '{platform}' não suportada.")
+@app_bot.on_event("startup")
+async def start_dispatcher():
+    # Cria os parsers já na inicialização: configuração inválida (ex: chave do Discord
+    # sem PyNaCl) falha aqui, e não com 500 em cada webhook
+    for platform in PayloadParserFactory.PLATFORMS:
+        PayloadParserFactory.get_parser(platform)
+    await dispatcher.start()
 
-    if not payload:
-        try:
-            payload_data = await request.json()
-            print(f"Webhook recebido de {platform} (JSON bruto): {payload_data}")
-            return {"status": "received", "platform": platform, "message": "Payload JSON genérico recebido. Adapte o parsing."}
+@app_bot.on_event("shutdown")
+async def stop_dispatcher():
+    await dispatcher.stop()
 
-        except Exception as e:
-            print(f"Erro ao processar payload JSON do webhook de {platform}: {e}")
-            pass
+@app_bot.get("/webhook/stats", summary="Profundidade da fila e latência de processamento")
+async def webhook_stats():
+    return dispatcher.stats()
 
-    if payload:
-        print(f"Webhook recebido de {platform}: User {payload.user_id} disse '{payload.text}'")
-        response_message = f"Recebido de {platform}: '{payload.text}' por {payload.user_id}"
-        return {"status": "received", "platform": platform, "response": response_message}
-    
-    return {"status": "received_empty_payload", "platform": platform, "message": "Webhook recebido, mas sem payload Pydantic claro. Verifique o log para JSON bruto."}
+@app_bot.post("/webhook/{platform}", summary="Recebe webhooks de bots")
+async def handle_webhook(platform: str, request: Request):
+    try:
+        parser = PayloadParserFactory.get_parser(platform)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # O corpo é lido uma única vez; verificação de assinatura e parsing usam os mesmos bytes
+    body = await request.body()
+    try:
+        result = parser.parse(request.headers, body)
+    except SignatureError as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+    except (ValueError, KeyError) as e:
+        logger.warning("Payload de webhook inválido", extra={"platform": platform, "error": str(e)})
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Payload de {platform} inválido: {e}")
+
+    if result.event is None:
+        return result.response or {"status": "ignored", "platform": platform}
+
+    event = result.event
+    queue_status = await dispatcher.enqueue(event)
+    if queue_status == "rejected":
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Fila de processamento cheia. Tente novamente.",
+            headers={"Retry-After": "5"},
+        )
+    logger.info("Webhook recebido", extra={"platform": platform, "user_id": event.user_id, "event_id": event.event_id, "status": queue_status})
+    return result.response or {"status": queue_status, "platform": platform, "event_id": event.event_id}
 
 @app_bot.post("/webhook/{platform}/upload", summary="Recebe webhooks com upload de arquivos")
 async def handle_webhook_upload(
@@ -61,7 +93,7 @@ async def handle_webhook_upload(
         with open(file_location, "wb+") as file_object:
             shutil.copyfileobj(file.file, file_object)
 
-        print(f"Arquivo '{file.filename}' de {platform} salvo em {file_location}")
+        logger.info("Arquivo de webhook salvo", extra={"platform": platform, "file_name": file.filename, "saved_path": file_location})
 
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erro ao salvar o arquivo: {e}")
@@ -0,0 +1,128 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Cliente do LLM Gateway para a interface de chat. Uma única instância é
+# compartilhada entre os reruns e sessões do Streamlit (st.cache_resource), então
+# as conexões TCP são reaproveitadas (keep-alive) em vez de abertas a cada mensagem.
+
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 60.0
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF_BASE = 0.25
+DEFAULT_BACKOFF_MAX = 4.0
+DEFAULT_MAX_IN_FLIGHT = 20
+DEFAULT_ACQUIRE_TIMEOUT = 5.0
+DEFAULT_POOL_SIZE = 20
+DEFAULT_CACHE_SIZE = 128
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+
+
+class GatewayBusyError(Exception):
+    pass
+
+
+@dataclass
+class GatewayResult:
+    response: str
+    latency_ms: float
+    attempts: int = 1
+    cached: bool = False
+
+
+class ResponseCache:
+    """Cache LRU de respostas por prompt, mantido por sessão do chat."""
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, prompt: str) -> Optional[str]:
+        key = prompt.strip()
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, prompt: str, response: str) -> None:
+        self.entries[prompt.strip()] = response
+        self.entries.move_to_end(prompt.strip())
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+class GatewayClient:
+    def __init__(
+        self,
+        url: str,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_BACKOFF_MAX,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        acquire_timeout: float = DEFAULT_ACQUIRE_TIMEOUT,
+        session: requests.Session = None,
+    ):
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.acquire_timeout = acquire_timeout
+        # Limita as requisições simultâneas ao gateway vindas deste processo
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self.session = session or self._build_session(max_in_flight)
+
+    @staticmethod
+    def _build_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, DEFAULT_POOL_SIZE), max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": espalha os reenvios para não sincronizar as sessões
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def invoke(self, prompt: str, cache: ResponseCache = None) -> GatewayResult:
+        start = time.perf_counter()
+        if cache is not None:
+            cached = cache.get(prompt)
+            if cached is not None:
+                return GatewayResult(cached, (time.perf_counter() - start) * 1000, attempts=0, cached=True)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            # O slot só é ocupado durante a requisição; a espera do backoff não bloqueia outras sessões
+            if not self._in_flight.acquire(timeout=self.acquire_timeout):
+                raise GatewayBusyError("Muitas requisições simultâneas ao LLM Gateway. Tente novamente em instantes.")
+            try:
+                response = self.session.post(self.url, json={"prompt": prompt}, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUS_CODES or attempt > self.max_retries:
+                    response.raise_for_status()
+                    break
+            except requests.exceptions.ConnectionError:
+                # Timeouts de leitura não são repetidos: o gateway pode ainda estar processando
+                if attempt > self.max_retries:
+                    raise
+            finally:
+                self._in_flight.release()
+            time.sleep(self._backoff(attempt - 1))
+
+        assistant_response = response.json()["response"]
+        if cache is not None:
+            cache.put(prompt, assistant_response)
+        return GatewayResult(assistant_response, (time.perf_counter() - start) * 1000, attempts=attempt)
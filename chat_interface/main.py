@@ -1,42 +1,66 @@
 import streamlit as st
 import requests
 import json
+import os
 
-LLM_GATEWAY_URL = "http://core_service:8002/llm/chat/invoke"
+# `streamlit run chat_interface/main.py` coloca o diretório do script no sys.path
+from client import GatewayBusyError, GatewayClient, ResponseCache
+
+LLM_GATEWAY_URL = os.getenv("LLM_GATEWAY_URL", "http://core_service:8002/llm/chat/invoke")
+
+@st.cache_resource
+def get_gateway_client() -> GatewayClient:
+    # Compartilhado entre reruns e sessões: mantém o pool de conexões keep-alive
+    return GatewayClient(LLM_GATEWAY_URL)
 
 st.title("Chat Interface para Testar LLM")
 
 if "messages" not in st.session_state:
     st.session_state.messages = []
+if "response_cache" not in st.session_state:
+    st.session_state.response_cache = ResponseCache()
+
+def render_latency(message: dict):
+    if "latency_ms" in message:
+        origem = "cache" if message.get("cached") else f"{message.get('attempts', 1)} tentativa(s)"
+        st.caption(f"⏱️ {message['latency_ms']:.0f} ms · {origem}")
 
 for message in st.session_state.messages:
     with st.chat_message(message["role"]):
         st.markdown(message["content"])
+        render_latency(message)
 
 if prompt := st.chat_input("Digite sua mensagem aqui..."):
     st.session_state.messages.append({"role": "user", "content": prompt})
     with st.chat_message("user"):
         st.markdown(prompt)
 
-    payload = {"prompt": prompt}
-
+    assistant_message = {"role": "assistant"}
     try:
-        response = requests.post(LLM_GATEWAY_URL, json=payload)
-        response.raise_for_status()
-        try:
-            llm_response_data = response.json()
-            assistant_response = llm_response_data["response"]
-
-        except json.JSONDecodeError:
-            assistant_response = f"Erro ao decodificar JSON da resposta do LLM Gateway. Resposta recebida: {response.text}"
-        except Exception as e:
-            assistant_response = f"Erro ao processar resposta do LLM: {str(e)}"
+        result = get_gateway_client().invoke(prompt, cache=st.session_state.response_cache)
+        assistant_message.update(content=result.response, latency_ms=result.latency_ms, attempts=result.attempts, cached=result.cached)
 
+    except GatewayBusyError as e:
+        assistant_message["content"] = str(e)
+    except (json.JSONDecodeError, KeyError) as e:
+        assistant_message["content"] = f"Erro ao decodificar a resposta do LLM Gateway: {str(e)}"
+    except requests.exceptions.Timeout as e:
+        assistant_message["content"] = f"O LLM Gateway não respondeu a tempo: {str(e)}"
     except requests.exceptions.RequestException as e:
-        assistant_response = f"Erro ao conectar com o LLM Gateway: {str(e)}"
+        assistant_message["content"] = f"Erro ao conectar com o LLM Gateway: {str(e)}"
     except Exception as e:
-        assistant_response = f"Ocorreu um erro inesperado: {str(e)}"
+        assistant_message["content"] = f"Ocorreu um erro inesperado: {str(e)}"
 
-    st.session_state.messages.append({"role": "assistant", "content": assistant_response})
+    st.session_state.messages.append(assistant_message)
     with st.chat_message("assistant"):
-        st.markdown(assistant_response)
\ No newline at end of file
+        st.markdown(assistant_message["content"])
+        render_latency(assistant_message)
+
+latencies = sorted(m["latency_ms"] for m in st.session_state.messages if "latency_ms" in m and not m.get("cached"))
+cache = st.session_state.response_cache
+st.sidebar.header("Métricas da sessão")
+st.sidebar.metric("Mensagens respondidas", len(latencies) + cache.hits)
+if latencies:
+    st.sidebar.metric("Latência média (ms)", f"{sum(latencies) / len(latencies):.0f}")
+    st.sidebar.metric("Latência p95 (ms)", f"{latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]:.0f}")
+st.sidebar.metric("Acertos de cache", f"{cache.hits} / {cache.hits + cache.misses}")
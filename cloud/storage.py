@@ -2,6 +2,10 @@ import boto3
 from azure.storage.blob import BlobServiceClient
 from fastapi import UploadFile
 from abc import ABC, abstractmethod
+from observability.log import get_logger
+from observability.metrics import STORAGE_OPERATION_SECONDS, timed
+
+logger = get_logger(__name__)
 
 class ICloudStorage(ABC):
     @abstractmethod
@@ -12,6 +16,14 @@ class ICloudStorage(ABC):
     def generate_presigned_url(self, bucket_name: str, file_name: str, expiration: int = 3600) -> str:
         pass
 
+    @abstractmethod
+    def download_file(self, bucket_name: str, file_name: str) -> bytes:
+        pass
+
+    @abstractmethod
+    def list_files(self, bucket_name: str, prefix: str = "") -> list[str]:
+        pass
+
 class AWSStorage(ICloudStorage):
     def __init__(self, access_key: str, secret_key: str, region_name: str = 'us-east-1'):
         self.s3_client = boto3.client(
@@ -21,14 +33,16 @@ class AWSStorage(ICloudStorage):
             region_name=region_name
         )
 
+    @timed(STORAGE_OPERATION_SECONDS, provider="aws", operation="upload_file")
     def upload_file(self, bucket_name: str, file_name: str, file_content: bytes) -> str:
         try:
             self.s3_client.put_object(Bucket=bucket_name, Key=file_name, Body=file_content)
             return f"https://{bucket_name}.s3.amazonaws.com/{file_name}"
         except Exception as e:
-            print(f"Erro ao fazer upload para AWS S3: {e}")
+            logger.exception("Erro ao fazer upload para AWS S3", extra={"bucket": bucket_name, "file_name": file_name})
             raise
 
+    @timed(STORAGE_OPERATION_SECONDS, provider="aws", operation="generate_presigned_url")
     def generate_presigned_url(self, bucket_name: str, file_name: str, expiration: int = 3600) -> str:
         try:
             response = self.s3_client.generate_presigned_url('get_object',
@@ -37,31 +51,53 @@ class AWSStorage(ICloudStorage):
                                                             ExpiresIn=expiration)
             return response
         except Exception as e:
-            print(f"Erro ao gerar URL pré-assinada para AWS S3: {e}")
+            logger.exception("Erro ao gerar URL pré-assinada para AWS S3", extra={"bucket": bucket_name, "file_name": file_name})
             raise
 
+    @timed(STORAGE_OPERATION_SECONDS, provider="aws", operation="download_file")
+    def download_file(self, bucket_name: str, file_name: str) -> bytes:
+        response = self.s3_client.get_object(Bucket=bucket_name, Key=file_name)
+        return response['Body'].read()
+
+    @timed(STORAGE_OPERATION_SECONDS, provider="aws", operation="list_files")
+    def list_files(self, bucket_name: str, prefix: str = "") -> list[str]:
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        return [obj['Key'] for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix) for obj in page.get('Contents', [])]
+
 class AzureStorage(ICloudStorage):
     def __init__(self, conn_str: str):
         try:
             self.blob_service_client = BlobServiceClient.from_connection_string(conn_str)
         except Exception as e:
-            print(f"Erro ao conectar ao Azure Blob Storage: {e}")
+            logger.exception("Erro ao conectar ao Azure Blob Storage")
             raise
 
+    @timed(STORAGE_OPERATION_SECONDS, provider="azure", operation="upload_file")
     def upload_file(self, bucket_name: str, file_name: str, file_content: bytes) -> str:
         try:
             blob_client = self.blob_service_client.get_blob_client(container=bucket_name, blob=file_name)
             blob_client.upload_blob(file_content, overwrite=True)
             return blob_client.url
         except Exception as e:
-            print(f"Erro ao fazer upload para Azure Blob Storage: {e}")
+            logger.exception("Erro ao fazer upload para Azure Blob Storage", extra={"bucket": bucket_name, "file_name": file_name})
             raise
 
+    @timed(STORAGE_OPERATION_SECONDS, provider="azure", operation="generate_presigned_url")
     def generate_presigned_url(self, bucket_name: str, file_name: str, expiration: int = 3600) -> str:
-        print(f"Gerando URL pré-assinada para {file_name} no Azure (simulado)")
+        logger.debug("Gerando URL pré-assinada no Azure (simulado)", extra={"file_name": file_name})
         blob_client = self.blob_service_client.get_blob_client(container=bucket_name, blob=file_name)
         return blob_client.url
 
+    @timed(STORAGE_OPERATION_SECONDS, provider="azure", operation="download_file")
+    def download_file(self, bucket_name: str, file_name: str) -> bytes:
+        blob_client = self.blob_service_client.get_blob_client(container=bucket_name, blob=file_name)
+        return blob_client.download_blob().readall()
+
+    @timed(STORAGE_OPERATION_SECONDS, provider="azure", operation="list_files")
+    def list_files(self, bucket_name: str, prefix: str = "") -> list[str]:
+        container_client = self.blob_service_client.get_container_client(bucket_name)
+        return [blob.name for blob in container_client.list_blobs(name_starts_with=prefix)]
+
 class GCPStorage(ICloudStorage):
     def __init__(self, credentials_path: str = None):
         from google.cloud import storage
@@ -70,12 +106,14 @@ class GCPStorage(ICloudStorage):
         else:
             self.storage_client = storage.Client()
 
+    @timed(STORAGE_OPERATION_SECONDS, provider="gcp", operation="upload_file")
     def upload_file(self, bucket_name: str, file_name: str, file_content: bytes) -> str:
         bucket = self.storage_client.bucket(bucket_name)
         blob = bucket.blob(file_name)
         blob.upload_from_string(file_content)
         return blob.public_url
 
+    @timed(STORAGE_OPERATION_SECONDS, provider="gcp", operation="generate_presigned_url")
     def generate_presigned_url(self, bucket_name: str, file_name: str, expiration: int = 3600) -> str:
         import datetime
         bucket = self.storage_client.bucket(bucket_name)
@@ -83,6 +121,14 @@ class GCPStorage(ICloudStorage):
         url = blob.generate_signed_url(expiration=datetime.timedelta(seconds=expiration), method='GET')
         return url
 
+    @timed(STORAGE_OPERATION_SECONDS, provider="gcp", operation="download_file")
+    def download_file(self, bucket_name: str, file_name: str) -> bytes:
+        return self.storage_client.bucket(bucket_name).blob(file_name).download_as_bytes()
+
+    @timed(STORAGE_OPERATION_SECONDS, provider="gcp", operation="list_files")
+    def list_files(self, bucket_name: str, prefix: str = "") -> list[str]:
+        return [blob.name for blob in self.storage_client.list_blobs(bucket_name, prefix=prefix)]
+
 class CloudStorageFactory:
     @staticmethod
     def get_storage_service(provider: str, config: dict) -> ICloudStorage:
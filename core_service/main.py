@@ -1,7 +1,11 @@
 from fastapi import FastAPI, Depends, HTTPException, Security, status
 from fastapi.security.api_key import APIKeyHeader, APIKey
-from pydantic import BaseModel
-from llm_gateway.gateway import router as llm_gateway_router  # Importa o roteador
+from pydantic import BaseModel, Field
+from llm_gateway.gateway import router as llm_gateway_router, llm_gateway_instance  # Importa o roteador
+from database.adapters import DatabaseFactory
+from observability.log import get_logger
+from observability.metrics import PrometheusMiddleware, metrics_router
+import os
 import secrets
 import toml # Para carregar configurações
 
@@ -21,15 +25,41 @@ VALID_API_KEYS = {
 
 ADMIN_API_KEY = "supersecretadminkey123" # Chave de admin para gerar novas chaves
 
+logger = get_logger(__name__)
+
 app = FastAPI(
     title="NF Agent Pro - Core Service",
     description="Serviço principal para processamento de Notas Fiscais e interações.",
     version="0.1.0"
 )
 
+# Latência por rota e endpoint /metrics para o Prometheus
+app.add_middleware(PrometheusMiddleware)
+app.include_router(metrics_router)
+
 # Inclui o roteador do LLM Gateway com o prefixo /llm
 app.include_router(llm_gateway_router, prefix="/llm", tags=["LLM Gateway"]) 
 
+@app.on_event("startup")
+async def init_database():
+    # Banco configurado via .env (DB_TYPE, DB_CONN_STRING); sem elas o serviço sobe sem banco
+    app.state.database = None
+    db_type = os.getenv("DB_TYPE")
+    conn_str = os.getenv("DB_CONN_STRING")
+    if db_type and conn_str:
+        app.state.database = DatabaseFactory.get_repository(db_type, conn_str)
+        await app.state.database.initialize() # Ex: garante os índices do MongoDB
+
+@app.on_event("startup")
+async def init_analytics():
+    # Cópia colunar das NFs para agregações (ANALYTICS_PATH ou ANALYTICS_STORAGE_PROVIDER +
+    # ANALYTICS_BUCKET); exposta ao LLM como ferramenta e atualizada por /admin/analytics/export
+    from analytics.columnar import NFAnalytics, build_analytics_tool, partition_store_from_env
+    store = partition_store_from_env()
+    app.state.analytics = NFAnalytics(store) if store else None
+    if app.state.analytics:
+        llm_gateway_instance.register_tool(build_analytics_tool(app.state.analytics))
+
 async def get_api_key(api_key_header: str = Security(api_key_header)):
     if api_key_header in VALID_API_KEYS:
         return api_key_header
@@ -51,6 +81,11 @@ class SefazCodeResponse(BaseModel):
     code: str
     description: str
 
+class AnalyticsExportRequest(BaseModel):
+    cnpj: str
+    year: int = Field(ge=2000, le=2100)
+    month: int = Field(ge=1, le=12)
+
 class NewAPIKeyResponse(BaseModel):
     api_key: str
     user_identifier: str # Para associar a chave a um usuário/cliente
@@ -87,9 +122,27 @@ async def generate_api_key(user_identifier: str, api_key: APIKey = Depends(get_a
         )
     new_key = secrets.token_urlsafe(32)
     VALID_API_KEYS[new_key] = user_identifier # Adiciona a nova chave ao "banco de dados"
-    print(f"Nova API Key gerada para '{user_identifier}': {new_key}")
+    logger.info("Nova API Key gerada", extra={"user_identifier": user_identifier})
     return {"api_key": new_key, "user_identifier": user_identifier}
 
+@app.post("/admin/analytics/export", summary="Reconstrói a partição analítica de um emitente/mês a partir do banco (requer chave de admin)")
+async def export_analytics(export_request: AnalyticsExportRequest, api_key: APIKey = Depends(get_api_key)):
+    if api_key != ADMIN_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required to export analytics"
+        )
+    from database.adapters import IStreamingDatabase
+    if app.state.analytics is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Cópia analítica não configurada (ANALYTICS_PATH ou ANALYTICS_STORAGE_PROVIDER).")
+    if not isinstance(app.state.database, IStreamingDatabase):
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Exportação requer um banco com consultas por intervalo (ex: DB_TYPE=mongodb).")
+    try:
+        total = await app.state.analytics.export_month(app.state.database, export_request.cnpj, export_request.year, export_request.month)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"cnpj": export_request.cnpj, "ano_mes": f"{export_request.year:04d}-{export_request.month:02d}", "nfs": total}
+
 @app.get("/admin/list_api_keys", summary="Lista API Keys ativas (requer chave de admin)")
 async def list_api_keys(api_key: APIKey = Depends(get_api_key)):
     if api_key != ADMIN_API_KEY:
@@ -1,27 +1,121 @@
+import time
 from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, Optional, Sequence
 from sqlalchemy import create_engine
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, IndexModel
+from observability.log import get_logger
+from observability.metrics import DB_QUERY_SECONDS, timed
+
+logger = get_logger(__name__)
+
+# Campos suficientes para montar o prompt na maioria das consultas; evita trafegar
+# a lista de itens, que domina o tamanho dos documentos de NF.
+NF_SUMMARY_FIELDS = (
+    "chave", "numero", "serie", "status", "data_emissao",
+    "emitente.cnpj", "emitente.razao_social", "destinatario.cnpj",
+    "valor_total", "valor_icms",
+)
+
+def month_bounds(year: int, month: int) -> tuple:
+    """Intervalo [início, fim) de um mês, para consultas por data de emissão."""
+    start = datetime(year, month, 1)
+    end = datetime(year + month // 12, month % 12 + 1, 1)
+    return start, end
 
 class IDatabase(ABC):
+    async def initialize(self) -> None:
+        """Preparação na inicialização do serviço (ex: criação de índices)."""
+        pass
+
+    @abstractmethod
+    async def get_nf(self, chave: str, fields: Optional[Sequence[str]] = None) -> dict:
+        pass
+
+class IStreamingDatabase(IDatabase):
+    """Bancos que iteram NFs por emitente e intervalo de emissão sem materializar o resultado."""
+
     @abstractmethod
-    async def get_nf(self, chave: str) -> dict:
+    def stream_nfs(self, cnpj_emitente: str, start: datetime, end: datetime,
+                   fields: Optional[Sequence[str]] = None) -> AsyncIterator[dict]:
         pass
 
 class PostgresRepository(IDatabase):
     def __init__(self, conn_str: str):
         self.engine = create_engine(conn_str)
 
-    async def get_nf(self, chave: str) -> dict:
-        print(f"Buscando NF {chave} no PostgreSQL (simulado)")
+    @timed(DB_QUERY_SECONDS, backend="postgresql", operation="get_nf")
+    async def get_nf(self, chave: str, fields: Optional[Sequence[str]] = None) -> dict:
+        logger.debug("Buscando NF no PostgreSQL (simulado)", extra={"chave": chave})
         return {"chave": chave, "dados": "dados do postgresql"}
 
-class MongoRepository(IDatabase):
-    def __init__(self, conn_str: str):
+class MongoRepository(IStreamingDatabase):
+    DEFAULT_DB_NAME = "nf_agent_db"
+    DEFAULT_COLLECTION = "notas_fiscais"
+    DEFAULT_BATCH_SIZE = 500
+
+    def __init__(self, conn_str: str, db_name: str = None, collection: str = DEFAULT_COLLECTION,
+                 batch_size: int = DEFAULT_BATCH_SIZE):
         self.client = AsyncIOMotorClient(conn_str)
+        if db_name:
+            self.db = self.client[db_name]
+        else:
+            self.db = self.client.get_default_database(default=self.DEFAULT_DB_NAME)
+        self.collection = self.db[collection]
+        self.batch_size = batch_size
+
+    @staticmethod
+    def _projection(fields: Optional[Sequence[str]]) -> dict:
+        projection = {"_id": 0}
+        if fields:
+            projection.update({field: 1 for field in fields})
+        return projection
+
+    async def initialize(self) -> None:
+        await self.ensure_indexes()
+
+    @timed(DB_QUERY_SECONDS, backend="mongodb", operation="ensure_indexes")
+    async def ensure_indexes(self) -> None:
+        # create_indexes é idempotente: índices já existentes com a mesma definição são mantidos
+        names = await self.collection.create_indexes([
+            IndexModel([("chave", ASCENDING)], name="chave_unique", unique=True),
+            # Atende consultas por CNPJ e por CNPJ + intervalo de emissão (prefixo do índice)
+            IndexModel([("emitente.cnpj", ASCENDING), ("data_emissao", ASCENDING)], name="emitente_cnpj_data_emissao"),
+            IndexModel([("data_emissao", ASCENDING)], name="data_emissao"),
+        ])
+        logger.info("Índices do MongoDB verificados", extra={"collection": self.collection.name, "indexes": names})
+
+    @timed(DB_QUERY_SECONDS, backend="mongodb", operation="get_nf")
+    async def get_nf(self, chave: str, fields: Optional[Sequence[str]] = None) -> Optional[dict]:
+        return await self.collection.find_one({"chave": chave}, self._projection(fields))
+
+    async def stream_nfs(self, cnpj_emitente: str, start: datetime, end: datetime,
+                         fields: Optional[Sequence[str]] = None, batch_size: int = None) -> AsyncIterator[dict]:
+        """Itera as NFs de um emitente em [start, end) sem materializar o resultado.
 
-    async def get_nf(self, chave: str) -> dict:
-        print(f"Buscando NF {chave} no MongoDB (simulado)")
-        return {"chave": chave, "dados": "dados do mongodb"}
+        Os documentos chegam em lotes de `batch_size` pelo cursor do servidor; a
+        métrica registra apenas o tempo de espera pelo banco, não o do consumidor.
+        """
+        cursor = self.collection.find(
+            {"emitente.cnpj": cnpj_emitente, "data_emissao": {"$gte": start, "$lt": end}},
+            self._projection(fields),
+            batch_size=batch_size or self.batch_size,
+        ).sort("data_emissao", ASCENDING)
+        waited = 0.0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    document = await cursor.next()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    waited += time.perf_counter() - started
+                yield document
+        finally:
+            DB_QUERY_SECONDS.labels(backend="mongodb", operation="stream_nfs").observe(waited)
+            await cursor.close()
 
 class DatabaseFactory:
     @staticmethod
@@ -31,4 +125,4 @@ class DatabaseFactory:
         elif db_type == "mongodb":
             return MongoRepository(conn_str)
         else:
-            raise ValueError(f"Tipo de banco de dados desconhecido: {db_type}")
\ No newline at end of file
+            raise ValueError(f"Tipo de banco de dados desconhecido: {db_type}")
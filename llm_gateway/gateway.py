@@ -1,22 +1,56 @@
 import yaml
+import json
 import os
+import time
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from observability.log import get_logger
+from observability.metrics import LLM_ERRORS, LLM_REQUEST_SECONDS, LLM_TIME_TO_FIRST_TOKEN_SECONDS
 
-CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'llm_config.yaml')
+logger = get_logger(__name__)
+
+CONFIG_PATH = os.getenv('LLM_CONFIG_PATH', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'llm_config.yaml'))
+MAX_TOOL_ROUNDS = 3
+
+@dataclass
+class LLMTool:
+    """Ferramenta que o LLM pode chamar (function calling). `parameters` é um JSON Schema."""
+    name: str
+    description: str
+    parameters: dict
+    handler: Callable[..., Awaitable[Any]]
+
+    def to_openai(self) -> dict:
+        return {"type": "function", "function": {"name": self.name, "description": self.description, "parameters": self.parameters}}
+
+    async def invoke(self, arguments: str) -> str:
+        try:
+            result = await self.handler(**json.loads(arguments or "{}"))
+        except Exception as e:
+            # O erro volta para o modelo, que pode corrigir os argumentos
+            logger.warning("Erro ao executar ferramenta do LLM", extra={"tool": self.name, "error": str(e)})
+            result = {"erro": str(e)}
+        return json.dumps(result, default=str, ensure_ascii=False)
 
 class LLMInterface(ABC):
     @abstractmethod
     async def generate_response(self, prompt: str, **kwargs) -> str:
         pass
 
+    async def stream_response(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        # Provedores sem streaming entregam a resposta inteira como um único trecho
+        yield await self.generate_response(prompt, **kwargs)
+
 class AzureOpenAILLM(LLMInterface):
     def __init__(self, api_base: str, deployment: str, api_key: str = None):
         self.api_base = api_base
         self.deployment = deployment
         self.api_key = api_key or os.getenv("AZURE_OPENAI_API_KEY")
-        print(f"AzureOpenAILLM inicializado: endpoint={api_base}, deployment={deployment}")
+        logger.info("AzureOpenAILLM inicializado", extra={"endpoint": api_base, "deployment": deployment})
 
     async def generate_response(self, prompt: str, **kwargs) -> str:
         return f"Resposta do Azure OpenAI para: '{prompt}' (deployment: {self.deployment})"
@@ -25,23 +59,53 @@ class OpenAILLM(LLMInterface):
     def __init__(self, api_key: str, model: str):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.model = model
-        from openai import OpenAI
-        self.client = OpenAI(api_key=self.api_key)
-        print(f"OpenAILLM inicializado: model={model}")
-
-    async def generate_response(self, prompt: str, **kwargs) -> str:
-        response = self.client.chat.completions.create(
+        from openai import AsyncOpenAI
+        # Cliente assíncrono: chamadas e streaming não bloqueiam o event loop
+        self.client = AsyncOpenAI(api_key=self.api_key)
+        logger.info("OpenAILLM inicializado", extra={"model": model})
+
+    async def generate_response(self, prompt: str, tools: list[LLMTool] = None, **kwargs) -> str:
+        messages = [{"role": "user", "content": prompt}]
+        tools_by_name = {tool.name: tool for tool in tools or []}
+        if tools_by_name:
+            kwargs["tools"] = [tool.to_openai() for tool in tools_by_name.values()]
+        for round_number in range(MAX_TOOL_ROUNDS + 1):
+            if round_number == MAX_TOOL_ROUNDS and tools_by_name:
+                # Última rodada: o modelo responde com os resultados que já tem
+                kwargs["tool_choice"] = "none"
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                **kwargs
+            )
+            message = response.choices[0].message
+            if not message.tool_calls:
+                break
+            messages.append(message.model_dump(exclude_none=True))
+            for call in message.tool_calls:
+                tool = tools_by_name.get(call.function.name)
+                content = await tool.invoke(call.function.arguments) if tool else json.dumps({"erro": f"Ferramenta desconhecida: {call.function.name}"})
+                messages.append({"role": "tool", "tool_call_id": call.id, "content": content})
+        if not message.content:
+            raise RuntimeError("O LLM não produziu uma resposta em texto.")
+        return message.content
+
+    async def stream_response(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        stream = await self.client.chat.completions.create(
             model=self.model,
             messages=[{"role": "user", "content": prompt}],
+            stream=True,
             **kwargs
         )
-        return response.choices[0].message.content
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
 
 class LlamaOllamaLLM(LLMInterface):
     def __init__(self, api_base: str, model: str):
         self.api_base = api_base
         self.model = model
-        print(f"LlamaOllamaLLM inicializado: api_base={api_base}, model={model}")
+        logger.info("LlamaOllamaLLM inicializado", extra={"api_base": api_base, "model": model})
 
     async def generate_response(self, prompt: str, **kwargs) -> str:
         return f"Resposta do Llama/Ollama para: '{prompt}' (model: {self.model} via {self.api_base})"
@@ -49,7 +113,13 @@ class LlamaOllamaLLM(LLMInterface):
 class LLMGateway:
     def __init__(self, config_path: str = CONFIG_PATH):
         self.config = self._load_config(config_path)
+        self.provider = self.config.get('provider')
         self.llm_service = self._initialize_llm_service()
+        self.tools: dict[str, LLMTool] = {}
+
+    def register_tool(self, tool: LLMTool) -> None:
+        """Disponibiliza uma ferramenta para provedores com function calling (ex: OpenAI)."""
+        self.tools[tool.name] = tool
 
     def _load_config(self, path: str) -> dict:
         try:
@@ -85,7 +155,33 @@ class LLMGateway:
     async def get_response(self, prompt: str, **kwargs) -> str:
         if not self.llm_service:
             raise RuntimeError("Serviço LLM não inicializado corretamente.")
-        return await self.llm_service.generate_response(prompt, **kwargs)
+        if self.tools and "tools" not in kwargs:
+            kwargs["tools"] = list(self.tools.values())
+        start = time.perf_counter()
+        try:
+            return await self.llm_service.generate_response(prompt, **kwargs)
+        except Exception:
+            LLM_ERRORS.labels(provider=self.provider).inc()
+            raise
+        finally:
+            LLM_REQUEST_SECONDS.labels(provider=self.provider).observe(time.perf_counter() - start)
+
+    async def stream_response(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        if not self.llm_service:
+            raise RuntimeError("Serviço LLM não inicializado corretamente.")
+        start = time.perf_counter()
+        first_token = True
+        try:
+            async for chunk in self.llm_service.stream_response(prompt, **kwargs):
+                if first_token:
+                    LLM_TIME_TO_FIRST_TOKEN_SECONDS.labels(provider=self.provider).observe(time.perf_counter() - start)
+                    first_token = False
+                yield chunk
+        except Exception:
+            LLM_ERRORS.labels(provider=self.provider).inc()
+            raise
+        finally:
+            LLM_REQUEST_SECONDS.labels(provider=self.provider).observe(time.perf_counter() - start)
 
 
 class ChatRequest(BaseModel):
@@ -107,16 +203,22 @@ async def chat_invoke(chat_request: ChatRequest):
         response = await llm_gateway_instance.get_response(chat_request.prompt)
         return {"response": response}
     except RuntimeError as e:
-        print(f"Erro no gateway: {e}")
+        logger.error("Erro no gateway", extra={"error": str(e)})
         raise HTTPException(status_code=500, detail=str(e))
     except ValueError as e: # Captura erros de configuração do LLMGateway
-        print(f"Erro no gateway 2: {e}")
+        logger.error("Erro de configuração no gateway", extra={"error": str(e)})
         raise HTTPException(status_code=500, detail=f"LLM Configuration Error: {str(e)}")
     except Exception as e:
-        # Log a exceção aqui para depuração
-        print(f"Erro no gateway3: {e}")
+        logger.exception("Erro inesperado no gateway")
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
 
+@router.post("/chat/stream", summary="Invoke LLM with a streamed response")
+async def chat_stream(chat_request: ChatRequest):
+    """
+    Streams the LLM's response as plain text chunks.
+    """
+    return StreamingResponse(llm_gateway_instance.stream_response(chat_request.prompt), media_type="text/plain")
+
 # Exemplo de uso (requer llm_config.yaml configurado e dependências instaladas):
 # async def main():
 #     gateway = LLMGateway()
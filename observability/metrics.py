@@ -0,0 +1,133 @@
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# Métricas compartilhadas entre os serviços. Os buckets incluem 2s para permitir
+# verificar o SLO de latência do README (< 2s) direto no Prometheus.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 30.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Latência das requisições HTTP por rota",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_duration_seconds", "Latência total das chamadas ao LLM por provedor",
+    ["provider"], buckets=LATENCY_BUCKETS,
+)
+LLM_TIME_TO_FIRST_TOKEN_SECONDS = Histogram(
+    "llm_time_to_first_token_seconds", "Tempo até o primeiro token em respostas em streaming",
+    ["provider"], buckets=LATENCY_BUCKETS,
+)
+LLM_ERRORS = Counter("llm_errors_total", "Falhas nas chamadas ao LLM", ["provider"])
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "Latência das consultas ao banco de dados",
+    ["backend", "operation"], buckets=LATENCY_BUCKETS,
+)
+STORAGE_OPERATION_SECONDS = Histogram(
+    "storage_operation_duration_seconds", "Latência das operações de armazenamento em nuvem",
+    ["provider", "operation"], buckets=LATENCY_BUCKETS,
+)
+QUEUE_DEPTH = Gauge("queue_depth", "Itens aguardando processamento por fila", ["queue"])
+WEBHOOK_EVENTS = Counter("webhook_events_total", "Eventos de webhook recebidos por resultado", ["platform", "status"])
+WEBHOOK_PROCESSING_SECONDS = Histogram(
+    "webhook_processing_duration_seconds", "Tempo entre o recebimento do webhook e o envio da resposta",
+    ["platform"], buckets=LATENCY_BUCKETS,
+)
+
+
+@contextmanager
+def track(histogram: Histogram, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(**labels).observe(time.perf_counter() - start)
+
+
+def timed(histogram: Histogram, **labels):
+    """Decorator que mede a duração de funções síncronas ou assíncronas."""
+    child = histogram.labels(**labels)
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    child.observe(time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+        return wrapper
+
+    return decorator
+
+
+def route_label(scope) -> str:
+    """Template da rota com os prefixos de include_router/app.mount (ex: /llm/chat/invoke).
+
+    Dependendo da versão do FastAPI, a rota casada guarda apenas o path relativo ao
+    router incluído; o prefixo é recuperado do path concreto, no ponto em que o
+    restante casa com o template. Rotas não encontradas ficam agrupadas para não
+    explodir a cardinalidade.
+    """
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    path_regex = getattr(route, "path_regex", None)
+    if not path_format:
+        return "unmatched"
+    path = scope.get("path", "")
+    if path_regex is not None:
+        for index, char in enumerate(path):
+            if char == "/" and path_regex.match(path[index:]):
+                return path[:index] + path_format
+    return scope.get("root_path", "") + path_format
+
+
+class PrometheusMiddleware:
+    """Middleware ASGI que mede a latência por rota (template, não o path concreto)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_SECONDS.labels(
+                method=scope["method"], route=route_label(scope), status=str(status_code)
+            ).observe(time.perf_counter() - start)
+
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics", summary="Métricas no formato Prometheus", include_in_schema=False)
+async def metrics():
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
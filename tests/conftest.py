@@ -0,0 +1,7 @@
+import pytest
+
+@pytest.fixture
+def offline_llm_config(monkeypatch, tmp_path):
+    # O llm_gateway lê o llm_config.yaml ao ser importado
+    from benchmarks.app import write_offline_llm_config
+    monkeypatch.setenv("LLM_CONFIG_PATH", write_offline_llm_config(str(tmp_path)))
@@ -0,0 +1,198 @@
+import json
+import os
+from datetime import datetime
+import pytest
+import pyarrow.parquet as pq
+from analytics.columnar import CloudPartitionStore, LocalPartitionStore, NFAnalytics, build_analytics_tool
+from benchmarks.fakes import FakeStorage
+from database.adapters import IStreamingDatabase
+
+CNPJ_A = "12345678000199"
+CNPJ_B = "98765432000155"
+
+def make_nf(chave: str, cnpj: str, data: datetime, icms: float, status: str = "autorizada") -> dict:
+    return {
+        "chave": chave, "status": status, "data_emissao": data,
+        "emitente": {"cnpj": cnpj, "razao_social": "Empresa"}, "destinatario": {"cnpj": "111", "uf": "SP"},
+        "valor_total": icms * 10, "valor_icms": icms,
+        "itens": [{"item": 1}], # Não faz parte da cópia analítica
+    }
+
+NFS = [
+    make_nf("1", CNPJ_A, datetime(2024, 3, 5), 100.0),
+    make_nf("2", CNPJ_A, datetime(2024, 3, 20), 50.0, status="cancelada"),
+    make_nf("3", CNPJ_A, datetime(2024, 4, 1), 70.0),
+    make_nf("4", CNPJ_B, datetime(2024, 3, 10), 30.0),
+]
+
+@pytest.fixture(params=["local", "cloud"])
+def analytics(request, tmp_path):
+    if request.param == "local":
+        store = LocalPartitionStore(str(tmp_path))
+    else:
+        store = CloudPartitionStore(FakeStorage(), "bucket-analytics")
+    analytics = NFAnalytics(store)
+    analytics.export_records(NFS)
+    return analytics
+
+def test_aggregate_prunes_by_emitter_and_month(analytics):
+    """Total de ICMS do CNPJ A em março: só a partição (A, 2024-03) entra na conta."""
+    result = analytics.aggregate("valor_icms", "sum", cnpj=CNPJ_A, start=datetime(2024, 3, 1), end=datetime(2024, 4, 1))
+    assert result == [{"valor_icms": 150.0, "nfs": 2}]
+    assert [key for key, _, _ in analytics._partitions(CNPJ_A, datetime(2024, 3, 1), datetime(2024, 4, 1))] == [
+        "nf_analytics/cnpj_emitente=12345678000199/ano_mes=2024-03/data.parquet"
+    ]
+
+def test_aggregate_with_filters_and_groups(analytics):
+    autorizadas = analytics.aggregate("valor_icms", "sum", cnpj=CNPJ_A, where={"status": "autorizada"})
+    assert autorizadas == [{"valor_icms": 170.0, "nfs": 2}]
+    por_mes = analytics.aggregate("valor_icms", "sum", group_by=["cnpj_emitente", "ano_mes"])
+    assert [(row["cnpj_emitente"], row["ano_mes"], row["valor_icms"]) for row in por_mes] == [
+        (CNPJ_A, "2024-03", 150.0), (CNPJ_A, "2024-04", 70.0), (CNPJ_B, "2024-03", 30.0),
+    ]
+
+def test_export_records_merges_by_chave(analytics):
+    analytics.export_records([make_nf("1", CNPJ_A, datetime(2024, 3, 5), 10.0), make_nf("5", CNPJ_A, datetime(2024, 3, 6), 5.0)])
+    result = analytics.aggregate("valor_icms", "sum", cnpj=CNPJ_A, start=datetime(2024, 3, 1), end=datetime(2024, 4, 1))
+    assert result == [{"valor_icms": 65.0, "nfs": 3}]
+
+def test_export_records_keeps_last_version_and_normalizes_cnpj(analytics):
+    written = analytics.export_records([
+        make_nf("6", "11.222.333/0001-81", datetime(2024, 5, 2), 10.0),
+        make_nf("6", "11.222.333/0001-81", datetime(2024, 5, 2), 15.0),
+        make_nf("7", "cnpj/../invalido", datetime(2024, 5, 3), 99.0),
+    ])
+    assert written == {"nf_analytics/cnpj_emitente=11222333000181/ano_mes=2024-05/data.parquet": 1}
+    assert analytics.aggregate("valor_icms", "sum", cnpj="11.222.333/0001-81") == [{"valor_icms": 15.0, "nfs": 1}]
+    assert analytics.aggregate("valor_icms", "sum") == [{"valor_icms": 265.0, "nfs": 5}]
+
+def test_aggregate_rejects_unknown_metric(analytics):
+    with pytest.raises(ValueError):
+        analytics.aggregate("itens", "sum")
+
+def test_aggregate_validates_cnpj_and_keeps_empty_shape(analytics):
+    """O CNPJ vindo do LLM é normalizado e validado antes de virar caminho de partição."""
+    assert analytics.aggregate("valor_icms", "sum", cnpj="12.345.678/0001-99") == [{"valor_icms": 220.0, "nfs": 3}]
+    assert analytics.aggregate("valor_icms", "sum", cnpj="11222333000181") == [{"valor_icms": None, "nfs": 0}]
+    assert analytics.aggregate("valor_icms", "count", cnpj="11222333000181") == [{"valor_icms": 0, "nfs": 0}]
+    with pytest.raises(ValueError):
+        analytics.aggregate("valor_icms", "sum", cnpj="../../etc")
+
+class StreamingDatabase(IStreamingDatabase):
+    async def get_nf(self, chave: str, fields=None) -> dict:
+        return {}
+
+    async def stream_nfs(self, cnpj_emitente, start, end, fields=None):
+        for nf in NFS:
+            if nf["emitente"]["cnpj"] == cnpj_emitente and start <= nf["data_emissao"] < end:
+                yield nf
+
+@pytest.mark.asyncio
+async def test_export_month_from_database_and_tool(tmp_path, offline_llm_config):
+    analytics = NFAnalytics(LocalPartitionStore(str(tmp_path)))
+    assert await analytics.export_month(StreamingDatabase(), CNPJ_A, 2024, 3) == 2
+
+    tool = build_analytics_tool(analytics)
+    result = json.loads(await tool.invoke(json.dumps({
+        "metric": "valor_icms", "agg": "sum", "cnpj": CNPJ_A, "data_inicio": "2024-03-01", "data_fim": "2024-04-01",
+    })))
+    assert result == [{"valor_icms": 150.0, "nfs": 2}]
+
+@pytest.mark.asyncio
+async def test_export_month_writes_row_groups_and_clears_empty_month(tmp_path, monkeypatch):
+    from analytics import columnar
+    monkeypatch.setattr(columnar, "ROW_GROUP_SIZE", 1)
+    store = LocalPartitionStore(str(tmp_path))
+    analytics = NFAnalytics(store)
+    assert await analytics.export_month(StreamingDatabase(), CNPJ_A, 2024, 3) == 2
+    key = "nf_analytics/cnpj_emitente=12345678000199/ano_mes=2024-03/data.parquet"
+    assert pq.ParquetFile(store.open(key)).num_row_groups == 2
+
+    class EmptyDatabase(StreamingDatabase):
+        async def stream_nfs(self, cnpj_emitente, start, end, fields=None):
+            return
+            yield
+
+    assert await analytics.export_month(EmptyDatabase(), CNPJ_A, 2024, 3) == 0
+    assert analytics.aggregate("valor_icms", "sum", cnpj=CNPJ_A, start=datetime(2024, 3, 1), end=datetime(2024, 4, 1)) == [{"valor_icms": None, "nfs": 0}]
+
+@pytest.mark.asyncio
+async def test_export_month_writes_off_the_event_loop_and_discards_on_error(tmp_path, monkeypatch):
+    import threading
+    from analytics import columnar
+    monkeypatch.setattr(columnar, "ROW_GROUP_SIZE", 1)
+    write_threads = []
+
+    class RecordingStore(LocalPartitionStore):
+        def sink(self, key):
+            write_threads.append(threading.get_ident())
+            return super().sink(key)
+
+    class FailingDatabase(StreamingDatabase):
+        async def stream_nfs(self, cnpj_emitente, start, end, fields=None):
+            async for nf in super().stream_nfs(cnpj_emitente, start, end, fields):
+                yield nf
+                raise ConnectionError("cursor perdido")
+
+    analytics = NFAnalytics(RecordingStore(str(tmp_path)))
+    assert await analytics.export_month(StreamingDatabase(), CNPJ_A, 2024, 3) == 2
+    assert write_threads and threading.get_ident() not in write_threads
+
+    with pytest.raises(ConnectionError):
+        await analytics.export_month(FailingDatabase(), CNPJ_A, 2024, 3)
+    # A partição anterior continua íntegra: o arquivo temporário foi descartado
+    assert analytics.aggregate("valor_icms", "sum", cnpj=CNPJ_A, start=datetime(2024, 3, 1), end=datetime(2024, 4, 1)) == [{"valor_icms": 150.0, "nfs": 2}]
+    assert [name for _, _, files in os.walk(tmp_path) for name in files if name.endswith(".tmp")] == []
+
+@pytest.mark.asyncio
+async def test_export_month_requires_streaming_database(tmp_path):
+    from database.adapters import PostgresRepository
+    analytics = NFAnalytics(LocalPartitionStore(str(tmp_path)))
+    with pytest.raises(TypeError):
+        await analytics.export_month(PostgresRepository("sqlite://"), CNPJ_A, 2024, 3)
+
+def test_partition_store_from_env(monkeypatch, tmp_path):
+    from analytics import columnar
+    from cloud import storage as cloud_storage
+    monkeypatch.delenv("ANALYTICS_STORAGE_PROVIDER", raising=False)
+    monkeypatch.delenv("ANALYTICS_PATH", raising=False)
+    assert columnar.partition_store_from_env() is None
+
+    monkeypatch.setenv("ANALYTICS_PATH", str(tmp_path))
+    assert isinstance(columnar.partition_store_from_env(), LocalPartitionStore)
+
+    configs = []
+    monkeypatch.setattr(cloud_storage.CloudStorageFactory, "get_storage_service",
+                        staticmethod(lambda provider, config: configs.append((provider, config)) or FakeStorage()))
+    monkeypatch.setenv("ANALYTICS_STORAGE_PROVIDER", "aws")
+    monkeypatch.setenv("AWS_REGION", "sa-east-1")
+    with pytest.raises(ValueError):
+        columnar.partition_store_from_env()
+    monkeypatch.setenv("ANALYTICS_BUCKET", "bucket-analytics")
+    store = columnar.partition_store_from_env()
+    assert isinstance(store, CloudPartitionStore) and store.bucket_name == "bucket-analytics"
+    assert configs[-1][0] == "aws" and configs[-1][1]["aws_region_name"] == "sa-east-1"
+
+@pytest.mark.asyncio
+async def test_admin_export_route_runs_export_month(monkeypatch, offline_llm_config):
+    import httpx
+    from core_service.main import ADMIN_API_KEY, app
+    from database.adapters import PostgresRepository
+    monkeypatch.setattr(app.state, "analytics", None, raising=False)
+    monkeypatch.setattr(app.state, "database", StreamingDatabase(), raising=False)
+    body = {"cnpj": "12.345.678/0001-99", "year": 2024, "month": 3}
+    admin = {"X-API-KEY": ADMIN_API_KEY}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.post("/admin/analytics/export", json=body, headers=admin)).status_code == 503
+
+        app.state.analytics = NFAnalytics(CloudPartitionStore(FakeStorage(), "bucket-analytics"))
+        assert (await client.post("/admin/analytics/export", json=body, headers={"X-API-KEY": "dev_key_123"})).status_code == 403
+        response = await client.post("/admin/analytics/export", json=body, headers=admin)
+        assert response.status_code == 200
+        assert response.json() == {"cnpj": body["cnpj"], "ano_mes": "2024-03", "nfs": 2}
+        assert app.state.analytics.aggregate("valor_icms", "sum", cnpj=CNPJ_A, start=datetime(2024, 3, 1), end=datetime(2024, 4, 1)) == [{"valor_icms": 150.0, "nfs": 2}]
+
+        assert (await client.post("/admin/analytics/export", json={**body, "cnpj": "123"}, headers=admin)).status_code == 400
+        assert (await client.post("/admin/analytics/export", json={**body, "month": 13}, headers=admin)).status_code == 422
+        app.state.database = PostgresRepository("sqlite://")
+        assert (await client.post("/admin/analytics/export", json=body, headers=admin)).status_code == 503
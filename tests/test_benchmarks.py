@@ -0,0 +1,31 @@
+from benchmarks.fakes import LatencyDistribution
+from benchmarks.run import compare, params_mismatch
+
+def test_compare_flags_regressions_in_both_directions():
+    baseline = {
+        "repository.get_nf": {"value": 2.0, "unit": "us", "better": "lower"},
+        "load.throughput": {"value": 1000.0, "unit": "rps", "better": "higher"},
+    }
+    ok = {
+        "repository.get_nf": {"value": 2.5, "unit": "us", "better": "lower"},
+        "load.throughput": {"value": 800.0, "unit": "rps", "better": "higher"},
+        "nova.metrica": {"value": 1.0, "unit": "us", "better": "lower"}, # Sem baseline, ignorada
+    }
+    assert compare(ok, baseline, tolerance=0.5) == []
+
+    slower = {
+        "repository.get_nf": {"value": 3.5, "unit": "us", "better": "lower"},
+        "load.throughput": {"value": 400.0, "unit": "rps", "better": "higher"},
+    }
+    assert [r["metric"] for r in compare(slower, baseline, tolerance=0.5)] == ["repository.get_nf", "load.throughput"]
+
+def test_latency_distribution_from_spec():
+    assert LatencyDistribution.from_spec("constant:0.05").sample() == 0.05
+    uniform = LatencyDistribution.from_spec("uniform:0.01:0.02", seed=1)
+    assert all(0.01 <= uniform.sample() <= 0.02 for _ in range(100))
+    assert all(LatencyDistribution.from_spec("normal:0.0:1.0", seed=1).sample() >= 0 for _ in range(100))
+
+def test_params_mismatch_blocks_comparison_across_configurations():
+    baseline = {"load": {"params": {"total_requests": 2000, "concurrency": 50}, "metrics": {}}}
+    assert params_mismatch("load", {"total_requests": 2000, "concurrency": 50}, baseline) == []
+    assert params_mismatch("load", {"total_requests": 2000, "concurrency": 100}, baseline) == ["load.concurrency: baseline=50, atual=100"]
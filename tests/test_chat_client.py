@@ -0,0 +1,74 @@
+import pytest
+import requests
+from chat_interface.client import GatewayBusyError, GatewayClient, ResponseCache
+
+class FakeResponse:
+    def __init__(self, status_code: int, payload: dict = None):
+        self.status_code = status_code
+        self.payload = payload or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code}")
+
+    def json(self):
+        return self.payload
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def post(self, url, json, timeout):
+        self.calls.append((url, json, timeout))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+def make_client(responses, **kwargs) -> GatewayClient:
+    return GatewayClient("http://gateway/llm/chat/invoke", session=FakeSession(responses), backoff_base=0, **kwargs)
+
+def test_retries_transient_failures_with_timeout():
+    client = make_client([
+        requests.exceptions.ConnectionError("recusada"),
+        FakeResponse(503),
+        FakeResponse(200, {"response": "NF autorizada"}),
+    ])
+    result = client.invoke("status da NF?")
+    assert (result.response, result.attempts, result.cached) == ("NF autorizada", 3, False)
+    assert all(timeout == client.timeout for _, _, timeout in client.session.calls)
+
+def test_does_not_retry_read_timeouts_or_client_errors():
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        make_client([requests.exceptions.ReadTimeout("lento")]).invoke("oi")
+    with pytest.raises(requests.exceptions.HTTPError):
+        make_client([FakeResponse(400)]).invoke("oi")
+
+def test_repeated_prompt_is_served_from_session_cache():
+    client = make_client([FakeResponse(200, {"response": "resposta"})])
+    cache = ResponseCache()
+    assert client.invoke("qual o ICMS?", cache=cache).cached is False
+    repeated = client.invoke(" qual o ICMS? ", cache=cache)
+    assert repeated.cached and repeated.response == "resposta"
+    assert len(client.session.calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_backpressure_when_in_flight_limit_is_reached():
+    client = make_client([], max_in_flight=1, acquire_timeout=0.01)
+    client._in_flight.acquire()
+    with pytest.raises(GatewayBusyError):
+        client.invoke("oi")
+
+def test_backoff_sleep_does_not_hold_in_flight_slot():
+    client = make_client([FakeResponse(503), FakeResponse(200, {"response": "ok"})], max_in_flight=1)
+    free_during_backoff = []
+
+    def backoff(attempt):
+        free_during_backoff.append(client._in_flight.acquire(blocking=False))
+        client._in_flight.release()
+        return 0
+
+    client._backoff = backoff
+    assert client.invoke("oi").attempts == 2
+    assert free_during_backoff == [True]
@@ -73,6 +73,93 @@ async def test_nf_query(database: IDatabase):
     assert "dados" in nf_data
     print(f"Teste de consulta NF para {nf_data.get('source', 'desconhecido')} passou.")
 
+class FakeMongoCursor:
+    def __init__(self, documents):
+        self.documents = iter(documents)
+        self.closed = False
+
+    def sort(self, *args):
+        return self
+
+    async def next(self):
+        try:
+            return next(self.documents)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def close(self):
+        self.closed = True
+
+class FakeMongoCollection:
+    def __init__(self, documents):
+        self.documents = documents
+        self.calls = []
+
+    def find(self, query, projection, batch_size):
+        self.calls.append((query, projection, batch_size))
+        self.cursor = FakeMongoCursor(self.documents)
+        return self.cursor
+
+    async def find_one(self, query, projection):
+        self.calls.append((query, projection))
+        return self.documents[0] if self.documents else None
+
+    async def create_indexes(self, indexes):
+        self.indexes = indexes
+        return [index.document["name"] for index in indexes]
+
+@pytest.mark.asyncio
+async def test_mongo_stream_nfs_uses_projection_and_cursor():
+    """Consulta por intervalo usa projeção, batch_size e fecha o cursor ao final."""
+    from database.adapters import MongoRepository, NF_SUMMARY_FIELDS, month_bounds
+
+    repository = MongoRepository("mongodb://localhost:27017/test_db", batch_size=200)
+    documents = [{"chave": str(i), "valor_icms": 10.0} for i in range(3)]
+    repository.collection = FakeMongoCollection(documents)
+
+    start, end = month_bounds(2024, 12)
+    streamed = [doc async for doc in repository.stream_nfs("12345678000199", start, end, fields=NF_SUMMARY_FIELDS)]
+
+    assert streamed == documents
+    query, projection, batch_size = repository.collection.calls[0]
+    assert query == {"emitente.cnpj": "12345678000199", "data_emissao": {"$gte": start, "$lt": end}}
+    assert projection["_id"] == 0 and projection["valor_icms"] == 1 and "itens" not in projection
+    assert batch_size == 200
+    assert end.year == 2025 and end.month == 1
+    assert repository.collection.cursor.closed
+
+@pytest.mark.asyncio
+async def test_mongo_get_nf_projection():
+    """Sem campos só o _id é excluído; com campos a projeção traz apenas o resumo."""
+    from database.adapters import MongoRepository, NF_SUMMARY_FIELDS
+
+    repository = MongoRepository("mongodb://localhost:27017/test_db")
+    repository.collection = FakeMongoCollection([{"chave": "123"}])
+
+    assert await repository.get_nf("123") == {"chave": "123"}
+    await repository.get_nf("123", fields=NF_SUMMARY_FIELDS)
+
+    (query, full), (_, summary) = repository.collection.calls
+    assert query == {"chave": "123"}
+    assert full == {"_id": 0}
+    assert summary == {"_id": 0, **{field: 1 for field in NF_SUMMARY_FIELDS}}
+
+@pytest.mark.asyncio
+async def test_mongo_initialize_creates_indexes():
+    from database.adapters import MongoRepository
+
+    repository = MongoRepository("mongodb://localhost:27017/test_db")
+    repository.collection = FakeMongoCollection([])
+    repository.collection.name = "notas_fiscais"
+    await repository.initialize()
+
+    indexes = {index.document["name"]: index.document for index in repository.collection.indexes}
+    assert list(indexes) == ["chave_unique", "emitente_cnpj_data_emissao", "data_emissao"]
+    assert indexes["chave_unique"]["unique"] is True
+    assert list(indexes["chave_unique"]["key"].items()) == [("chave", 1)]
+    assert list(indexes["emitente_cnpj_data_emissao"]["key"].items()) == [("emitente.cnpj", 1), ("data_emissao", 1)]
+    assert list(indexes["data_emissao"]["key"].items()) == [("data_emissao", 1)]
+
 # Para rodar os testes: pytest
 # Certifique-se de ter o pytest e pytest-asyncio instalados (adicionar ao requirements.txt se necessário)
-# pytest-asyncio é necessário para testes com funções async.
\ No newline at end of file
+# pytest-asyncio é necessário para testes com funções async.
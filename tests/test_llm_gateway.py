@@ -0,0 +1,48 @@
+import json
+from types import SimpleNamespace
+import pytest
+
+class FakeCompletions:
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=self.messages.pop(0))])
+
+def tool_call_message(call_id: str):
+    call = SimpleNamespace(id=call_id, function=SimpleNamespace(name="somar", arguments=json.dumps({"a": 1, "b": 2})))
+    return SimpleNamespace(content=None, tool_calls=[call], model_dump=lambda **kwargs: {"role": "assistant", "tool_calls": [call_id]})
+
+def make_llm(messages):
+    from llm_gateway.gateway import OpenAILLM
+    llm = OpenAILLM(api_key="teste", model="gpt-teste")
+    llm.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(messages)))
+    return llm
+
+def make_tool():
+    from llm_gateway.gateway import LLMTool
+
+    async def somar(a: int, b: int) -> dict:
+        return {"total": a + b}
+
+    return LLMTool(name="somar", description="Soma", parameters={"type": "object"}, handler=somar)
+
+@pytest.mark.asyncio
+async def test_last_tool_round_forces_text_answer(offline_llm_config):
+    from llm_gateway.gateway import MAX_TOOL_ROUNDS
+    messages = [tool_call_message(f"call-{i}") for i in range(MAX_TOOL_ROUNDS)]
+    llm = make_llm(messages + [SimpleNamespace(content="O total é 3.", tool_calls=None)])
+
+    assert await llm.generate_response("quanto é 1 + 2?", tools=[make_tool()]) == "O total é 3."
+    calls = llm.client.chat.completions.calls
+    assert len(calls) == MAX_TOOL_ROUNDS + 1
+    assert "tool_choice" not in calls[0] and calls[-1]["tool_choice"] == "none"
+    assert calls[-1]["messages"][-1] == {"role": "tool", "tool_call_id": f"call-{MAX_TOOL_ROUNDS - 1}", "content": '{"total": 3}'}
+
+@pytest.mark.asyncio
+async def test_empty_answer_raises(offline_llm_config):
+    llm = make_llm([SimpleNamespace(content=None, tool_calls=None)])
+    with pytest.raises(RuntimeError):
+        await llm.generate_response("oi")
@@ -0,0 +1,72 @@
+import asyncio
+import json
+import logging
+import queue
+import sys
+import httpx
+from fastapi import APIRouter, FastAPI
+from observability.log import JsonFormatter, SamplingFilter, StructuredQueueHandler
+from observability.metrics import DB_QUERY_SECONDS, HTTP_REQUEST_SECONDS, PrometheusMiddleware, timed
+
+def _sample_count(histogram, **labels) -> float:
+    return next(
+        sample.value for metric in histogram.collect() for sample in metric.samples
+        if sample.name.endswith("_count") and all(sample.labels.get(k) == v for k, v in labels.items())
+    )
+
+def test_timed_records_async_calls():
+    @timed(DB_QUERY_SECONDS, backend="teste", operation="get_nf")
+    async def get_nf(chave: str) -> dict:
+        return {"chave": chave}
+
+    before = _sample_count(DB_QUERY_SECONDS, backend="teste", operation="get_nf")
+    assert asyncio.run(get_nf("123")) == {"chave": "123"}
+    after = _sample_count(DB_QUERY_SECONDS, backend="teste", operation="get_nf")
+    assert after == before + 1
+
+def test_sampling_filter_never_drops_warnings():
+    sampling = SamplingFilter(rate=0.0)
+    info = logging.makeLogRecord({"levelno": logging.INFO, "levelname": "INFO"})
+    warning = logging.makeLogRecord({"levelno": logging.WARNING, "levelname": "WARNING"})
+    assert not sampling.filter(info)
+    assert sampling.filter(warning)
+
+def test_json_formatter_includes_extra_fields():
+    record = logging.makeLogRecord({"name": "nfagent.teste", "msg": "NF consultada", "levelname": "INFO", "chave": "123"})
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "NF consultada"
+    assert entry["chave"] == "123"
+
+def test_queue_handler_keeps_exc_info_out_of_message():
+    captured = queue.SimpleQueue()
+    handler = StructuredQueueHandler(captured)
+    logger = logging.getLogger("teste.exc_info")
+    try:
+        raise ValueError("chave inválida")
+    except ValueError:
+        record = logger.makeRecord(logger.name, logging.ERROR, __file__, 0, "Falha ao consultar %s", ("NF",), sys.exc_info())
+    handler.handle(record)
+    entry = json.loads(JsonFormatter().format(captured.get_nowait()))
+    assert entry["message"] == "Falha ao consultar NF"
+    assert "ValueError: chave inválida" in entry["exc_info"]
+
+def test_middleware_labels_include_router_prefix_and_mount_path():
+    router = APIRouter()
+
+    @router.get("/chat/{chat_id}")
+    async def chat(chat_id: str):
+        return {"chat_id": chat_id}
+
+    sub_app = FastAPI()
+    sub_app.include_router(router, prefix="/llm")
+    sub_app.add_middleware(PrometheusMiddleware)
+    app = FastAPI()
+    app.mount("/bot", sub_app)
+
+    async def call():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://teste") as client:
+            assert (await client.get("/bot/llm/chat/42")).status_code == 200
+
+    asyncio.run(call())
+    assert _sample_count(HTTP_REQUEST_SECONDS, route="/bot/llm/chat/{chat_id}", status="200") == 1
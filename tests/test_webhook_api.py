@@ -0,0 +1,109 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+import httpx
+import pytest
+from bot_framework import webhook
+from bot_framework.dispatcher import BotEvent, IPlatformSender, WebhookDispatcher
+from bot_framework.parsers import DiscordParser, PayloadParserFactory, SlackParser
+
+SLACK_SECRET = "segredo-de-teste"
+
+class RecordingSender(IPlatformSender):
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, event: BotEvent, text: str) -> None:
+        self.sent.append((event.event_id, text))
+
+def slack_event(event_id: str) -> bytes:
+    return json.dumps({
+        "type": "event_callback", "event_id": event_id,
+        "event": {"type": "message", "user": "U1", "text": "status da NF", "channel": "C1"},
+    }).encode()
+
+def slack_headers(body: bytes, secret: str = SLACK_SECRET) -> dict:
+    timestamp = str(int(time.time()))
+    signature = hmac.new(secret.encode(), b"v0:" + timestamp.encode() + b":" + body, hashlib.sha256).hexdigest()
+    return {"x-slack-request-timestamp": timestamp, "x-slack-signature": f"v0={signature}"}
+
+@pytest.fixture
+def bot_app(monkeypatch):
+    """app_bot com parsers próprios do teste e um dispatcher cujo handler só termina quando liberado."""
+    release = asyncio.Event()
+
+    async def blocking_handler(event: BotEvent) -> str:
+        await release.wait()
+        return f"eco: {event.text}"
+
+    dispatcher = WebhookDispatcher(handler=blocking_handler, workers=1, maxsize=1)
+    sender = RecordingSender()
+    dispatcher.register_sender("slack", sender)
+    monkeypatch.setattr(webhook, "dispatcher", dispatcher)
+    monkeypatch.setattr(PayloadParserFactory, "_parsers", {})
+    PayloadParserFactory.register_parser("slack", SlackParser(signing_secret=SLACK_SECRET))
+    PayloadParserFactory.register_parser("discord", DiscordParser())
+    return dispatcher, sender, release
+
+def client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=webhook.app_bot), base_url="http://bot")
+
+@pytest.mark.asyncio
+async def test_webhook_acks_before_handler_and_drops_retries(bot_app):
+    dispatcher, sender, release = bot_app
+    async with client() as http:
+        body = slack_event("Ev1")
+        response = await http.post("/webhook/slack", content=body, headers=slack_headers(body))
+        assert response.status_code == 200
+        assert response.json() == {"status": "queued", "platform": "slack", "event_id": "Ev1"}
+        assert sender.sent == [] # O handler ainda não terminou
+
+        retry = await http.post("/webhook/slack", content=body, headers=slack_headers(body))
+        assert retry.json()["status"] == "duplicate"
+
+        stats = (await http.get("/webhook/stats")).json()
+        assert stats["duplicates"] == 1
+
+    release.set()
+    await dispatcher.stop()
+    assert sender.sent == [("Ev1", "eco: status da NF")]
+
+@pytest.mark.asyncio
+async def test_webhook_returns_503_when_queue_is_full(bot_app):
+    dispatcher, _, release = bot_app
+    async with client() as http:
+        for event_id in ("Ev1", "Ev2"):
+            body = slack_event(event_id)
+            assert (await http.post("/webhook/slack", content=body, headers=slack_headers(body))).status_code == 200
+            await asyncio.sleep(0) # Worker retira o Ev1 da fila e fica bloqueado no handler
+        body = slack_event("Ev3")
+        response = await http.post("/webhook/slack", content=body, headers=slack_headers(body))
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "5"
+    release.set()
+    await dispatcher.stop()
+
+@pytest.mark.asyncio
+async def test_webhook_parser_paths(bot_app):
+    dispatcher, _, release = bot_app
+    async with client() as http:
+        body = slack_event("Ev1")
+        assert (await http.post("/webhook/slack", content=body, headers=slack_headers(body, secret="outro"))).status_code == 401
+
+        challenge = b'{"type": "url_verification", "challenge": "abc"}'
+        response = await http.post("/webhook/slack", content=challenge, headers=slack_headers(challenge))
+        assert response.json() == {"challenge": "abc"}
+
+        command = json.dumps({
+            "type": 2, "id": "int-1", "application_id": "app", "token": "tok", "channel_id": "ch",
+            "member": {"user": {"id": "42"}}, "data": {"name": "nf", "options": [{"name": "pergunta", "value": "ICMS?"}]},
+        }).encode()
+        response = await http.post("/webhook/discord", content=command)
+        assert response.status_code == 200
+        assert response.json() == {"type": 5}
+
+        assert (await http.post("/webhook/whatsapp", content=b"{}")).status_code == 400
+    release.set()
+    await dispatcher.stop()
@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+from bot_framework.dispatcher import BotEvent, IPlatformSender, WebhookDispatcher
+
+class RecordingSender(IPlatformSender):
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, event: BotEvent, text: str) -> None:
+        self.sent.append((event.event_id, text))
+
+async def echo_handler(event: BotEvent) -> str:
+    await asyncio.sleep(0.01) # Simula a latência do LLM
+    return f"eco: {event.text}"
+
+def make_event(event_id: str, text: str = "qual o status da NF?") -> BotEvent:
+    return BotEvent(event_id=event_id, platform="slack", user_id="U123", text=text)
+
+@pytest.mark.asyncio
+async def test_dispatcher_processes_in_background():
+    """O enqueue retorna antes do handler terminar e a resposta chega pelo sender."""
+    sender = RecordingSender()
+    dispatcher = WebhookDispatcher(handler=echo_handler, workers=2)
+    dispatcher.register_sender("slack", sender)
+
+    assert await dispatcher.enqueue(make_event("ev-1")) == "queued"
+    assert sender.sent == []
+
+    await dispatcher.stop()
+    assert sender.sent == [("ev-1", "eco: qual o status da NF?")]
+    stats = dispatcher.stats()
+    assert stats["processed"] == 1
+    assert stats["latency_seconds"]["samples"] == 1
+
+@pytest.mark.asyncio
+async def test_dispatcher_drops_platform_retries():
+    """Reenvios com o mesmo event_id são descartados."""
+    sender = RecordingSender()
+    dispatcher = WebhookDispatcher(handler=echo_handler)
+    dispatcher.register_sender("slack", sender)
+
+    assert await dispatcher.enqueue(make_event("ev-1")) == "queued"
+    assert await dispatcher.enqueue(make_event("ev-1")) == "duplicate"
+
+    await dispatcher.stop()
+    assert len(sender.sent) == 1
+    assert dispatcher.stats()["duplicates"] == 1
+
+@pytest.mark.asyncio
+async def test_dispatcher_rejects_when_queue_is_full():
+    """Com a fila cheia o evento é recusado e o id liberado para o reenvio."""
+    blocker = asyncio.Event()
+
+    async def blocking_handler(event: BotEvent) -> str:
+        await blocker.wait()
+        return "ok"
+
+    dispatcher = WebhookDispatcher(handler=blocking_handler, workers=1, maxsize=1)
+    dispatcher.register_sender("slack", RecordingSender())
+
+    assert await dispatcher.enqueue(make_event("ev-1")) == "queued"
+    await asyncio.sleep(0) # Worker retira o ev-1 da fila
+    assert await dispatcher.enqueue(make_event("ev-2")) == "queued"
+    assert await dispatcher.enqueue(make_event("ev-3")) == "rejected"
+    assert dispatcher.stats()["queue_depth"] == 1
+
+    blocker.set()
+    await dispatcher.stop()
+    assert await dispatcher.enqueue(make_event("ev-3")) == "queued"
+    await dispatcher.stop()
+
+@pytest.mark.asyncio
+async def test_dispatcher_stop_does_not_hang_on_stuck_handler():
+    """Um handler travado não impede o encerramento: após o prazo os workers são cancelados."""
+    async def hung_handler(event: BotEvent) -> str:
+        await asyncio.Event().wait()
+
+    dispatcher = WebhookDispatcher(handler=hung_handler, workers=1)
+    assert await dispatcher.enqueue(make_event("ev-1")) == "queued"
+    await asyncio.sleep(0)
+
+    await asyncio.wait_for(dispatcher.stop(drain_timeout=0.05), timeout=1)
+    assert not dispatcher.running
@@ -0,0 +1,129 @@
+import hashlib
+import hmac
+import json
+import time
+import pytest
+from bot_framework.parsers import DiscordParser, PayloadParserFactory, SignatureError, SlackParser, TeamsParser
+
+SLACK_SECRET = "segredo-de-teste"
+
+def slack_headers(body: bytes, secret: str = SLACK_SECRET) -> dict:
+    timestamp = str(int(time.time()))
+    signature = hmac.new(secret.encode(), b"v0:" + timestamp.encode() + b":" + body, hashlib.sha256).hexdigest()
+    return {"x-slack-request-timestamp": timestamp, "x-slack-signature": f"v0={signature}"}
+
+def test_slack_event_callback_is_normalized():
+    body = json.dumps({
+        "type": "event_callback",
+        "event_id": "Ev123",
+        "event": {"type": "message", "user": "U1", "text": "status da NF 123", "channel": "C1"},
+    }).encode()
+    result = SlackParser(signing_secret=SLACK_SECRET).parse(slack_headers(body), body)
+    assert result.event.event_id == "Ev123"
+    assert result.event.user_id == "U1"
+    assert result.event.text == "status da NF 123"
+    assert result.event.conversation_id == "C1"
+
+def test_slack_rejects_invalid_signature():
+    body = b'{"type": "event_callback"}'
+    with pytest.raises(SignatureError):
+        SlackParser(signing_secret=SLACK_SECRET).parse(slack_headers(body, secret="outro"), body)
+
+def test_slack_url_verification_and_bot_messages():
+    parser = SlackParser()
+    challenge = parser.parse({}, b'{"type": "url_verification", "challenge": "abc"}')
+    assert challenge.event is None and challenge.response == {"challenge": "abc"}
+    bot_message = parser.parse({}, json.dumps({
+        "type": "event_callback", "event_id": "Ev2", "event": {"type": "message", "bot_id": "B1", "text": "eco"},
+    }).encode())
+    assert bot_message.event is None
+
+def test_teams_activity_is_normalized():
+    body = json.dumps({
+        "type": "message",
+        "id": "act-1",
+        "from": {"id": "29:abc"},
+        "conversation": {"id": "conv-1"},
+        "serviceUrl": "https://smba.trafficmanager.net/br/",
+        "text": "consultar NF",
+    }).encode()
+    event = TeamsParser().parse({}, body).event
+    assert event.event_id == "act-1"
+    assert event.user_id == "29:abc"
+    assert event.reply_url == "https://smba.trafficmanager.net/br/v3/conversations/conv-1/activities/act-1"
+
+def test_discord_ping_and_command():
+    parser = DiscordParser()
+    assert parser.parse({}, b'{"type": 1}').response == {"type": 1}
+    result = parser.parse({}, json.dumps({
+        "type": 2, "id": "int-1", "application_id": "app", "token": "tok", "channel_id": "ch",
+        "member": {"user": {"id": "42"}},
+        "data": {"name": "nf", "options": [{"name": "pergunta", "value": "qual o ICMS?"}]},
+    }).encode())
+    assert result.response == {"type": 5}
+    assert result.event.text == "qual o ICMS?"
+    assert result.event.user_id == "42"
+
+def test_factory_rejects_unknown_platform_and_accepts_internal_format():
+    with pytest.raises(ValueError):
+        PayloadParserFactory.get_parser("whatsapp")
+    event = TeamsParser().parse({}, b'{"user_id": "u1", "text": "oi", "event_id": "e1"}').event
+    assert (event.event_id, event.platform, event.user_id) == ("e1", "teams", "u1")
+
+def test_discord_signature_is_verified():
+    signing = pytest.importorskip("nacl.signing")
+    key = signing.SigningKey.generate()
+    parser = DiscordParser(public_key=key.verify_key.encode().hex())
+    body = b'{"type": 1}'
+    signature = key.sign(b"1700000000" + body).signature.hex()
+    headers = {"x-signature-timestamp": "1700000000", "x-signature-ed25519": signature}
+    assert parser.parse(headers, body).response == {"type": 1}
+    with pytest.raises(SignatureError):
+        parser.parse(headers, b'{"type": 2}')
+
+def test_missing_secret_logs_warning(monkeypatch):
+    from bot_framework import parsers
+    warnings = []
+    monkeypatch.setattr(parsers.logger, "warning", lambda msg, extra=None: warnings.append(extra["platform"]))
+    SlackParser()
+    DiscordParser(public_key="00" * 32)
+    assert warnings == ["slack"]
+
+@pytest.mark.parametrize("parser, payload", [
+    (SlackParser(), {"type": "event_callback", "event_id": "Ev1", "event": [1]}),
+    (TeamsParser(), {"type": "message", "from": "x", "id": "1"}),
+    (TeamsParser(), {"type": "message", "id": ["1"]}),
+    (DiscordParser(), {"type": 2, "id": "1", "member": {"user": "42"}}),
+    (DiscordParser(), {"type": 2, "id": "1", "data": {"options": ["x"]}}),
+])
+def test_malformed_nested_fields_raise_value_error(parser, payload):
+    """Formato inesperado vira ValueError, que o endpoint devolve como 400 e não 500."""
+    with pytest.raises(ValueError):
+        parser.parse({}, json.dumps(payload).encode())
+
+class StaticKeyClient:
+    def __init__(self, key):
+        self.key = key
+
+    def get_signing_key_from_jwt(self, token):
+        return self
+
+def test_teams_bot_framework_jwt_is_validated():
+    jwt = pytest.importorskip("jwt")
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    parser = TeamsParser(app_id="app-1", jwks_client=StaticKeyClient(private_key.public_key()))
+
+    def bearer(**claims) -> dict:
+        claims = {"iss": "https://api.botframework.com", "aud": "app-1", "serviceurl": "https://smba.trafficmanager.net/br/",
+                  "exp": int(time.time()) + 60, **claims}
+        return {"authorization": "Bearer " + jwt.encode(claims, private_key, algorithm="RS256")}
+
+    body = json.dumps({
+        "type": "message", "id": "act-1", "from": {"id": "29:abc"}, "conversation": {"id": "conv-1"},
+        "serviceUrl": "https://smba.trafficmanager.net/br/", "text": "consultar NF",
+    }).encode()
+    assert parser.parse(bearer(), body).event.reply_url.startswith("https://smba.trafficmanager.net/br/v3/")
+    for headers in ({}, bearer(aud="outro-app"), bearer(exp=int(time.time()) - 3600), bearer(serviceurl="https://atacante.example/")):
+        with pytest.raises(SignatureError):
+            parser.parse(headers, body)